@@ -1,41 +1,194 @@
+import heapq
+import mmap
 import random
-import copy
-from model import Maze, Node, Stack
+from bisect import bisect_left, bisect_right
+from collections import deque
+import tempfile
+from multiprocessing import Pool
+from array import array
+from metrics import METRICS, timed
+from model import Maze, Node, PackedWalls, Spanning3, Stack, UnionFind, NORTH, WEST, VISITED, DIRECTION_X, \
+    DIRECTION_Y
+
+SINGLE_LINKS = frozenset((1, 2, 4, 8))       # the links of a dead-end: a single direction-bit
 
 class Generator:
-    def __init__(self, maze:Maze):
-        self.maze = maze
-        self.startX, self.startY = random.randint(0,self.maze.sizeX), random.randint(0,self.maze.sizeY)
-        self._spanning3:dict = {}
-        self._generateMaze()
+    ALGORITHMS = ("dfs", "kruskal", "wilson", "prim", "sidewinder", "binarytree", "tiles")
+
+    @timed("generator.generate")
+    def __init__(self, maze:Maze, algorithm="dfs", tileSize=512, workers=None, rng=None):
+        """ Generates a perfect maze with the chosen algorithm into the walls of the maze and builds its spanning3.
+
+        Every algorithm only carves paths with _carve, which removes the wall in the maze and stores the path in the
+        links of the spanning3, so all algorithms fill the same wall grid and Spanning3.
+
+        :param maze: the maze, whose walls are carved
+        :param algorithm: one of Generator.ALGORITHMS: randomized depth-first search ("dfs", long corridors),
+         union-find Kruskal ("kruskal"), Wilson's uniform spanning-tree ("wilson"), randomized Prim ("prim") or the
+         cheap row-wise "sidewinder" and "binarytree" (both with a bias to the north-west) or "tiles", which generates
+         tiles of the maze with depth-first search in parallel processes and stitches them together
+        :param tileSize: the maximum cell count of both axes of a tile ("tiles" only)
+        :param workers: the count of worker processes, None uses one per core ("tiles" only)
+        :param rng: the random.Random-instance of the generation, the seeded rng of the maze if None
+        """
+        if algorithm not in self.ALGORITHMS:
+            raise ValueError("unknown algorithm '{}', choose one of {}".format(algorithm, ", ".join(self.ALGORITHMS)))
+        self.maze, self.algorithm, self.rng = maze, algorithm, maze.rng if rng is None else rng
+        self.maze.algorithm = algorithm
+        self.startX, self.startY = self.rng.randint(0,self.maze.sizeX-2), self.rng.randint(0,self.maze.sizeY-2)
+        self._spanning3:Spanning3 = None
+        self._rootedTree, self._lcaIndex, self._distanceField, self._diameter = None, None, None, None
+        self._links = bytearray(len(self.maze.walls))
+        match algorithm:
+            case "dfs":
+                self._generateMaze()
+            case "kruskal":
+                self._generateKruskal()
+            case "wilson":
+                self._generateWilson()
+            case "prim":
+                self._generatePrim()
+            case "sidewinder":
+                self._generateSidewinder()
+            case "binarytree":
+                self._generateBinaryTree()
+            case "tiles":
+                self._generateTiles(tileSize, workers)
+        self._spanning3, self._links = Spanning3(self.maze, self._links), None
+        self.isPerfect = True                    # a perfect maze has exactly one path between two cells, see braid
+        METRICS.increment("generator.cells", (self.maze.sizeX - 1) * (self.maze.sizeY - 1))
+
+    def getSpanning3(self) -> Spanning3:
+        """ Returns the frozen spanning3 itself and not a copy, as the Spanning3 is read-only and shared by all users. """
+        return self._spanning3
+
+    def getRootedTree(self):
+        """ Returns the spanning3 rooted at the start-cell of the generation, which is built once on the first call. """
+        if self._rootedTree is None:
+            self._rootedTree = RootedTree(self._spanning3, self.maze.getNode(self.startX, self.startY))
+        return self._rootedTree
+
+    def getLCAIndex(self):
+        """ Returns the LCAIndex of the spanning3 rooted at the start-cell, which is built once on the first call. """
+        if self._lcaIndex is None:
+            self._lcaIndex = LCAIndex(self._spanning3, self.maze.getNode(self.startX, self.startY))
+        return self._lcaIndex
+
+    def getDistanceField(self, targetX, targetY):
+        """ Returns the DistanceField to the target-cell, the field of the last target is kept for the next call. """
+        targetId = self.maze.getId(targetX, targetY)
+        if self._distanceField is None or self._distanceField.root != targetId:
+            self._distanceField = DistanceField(self._spanning3, self.maze.getNode(targetX, targetY))
+        return self._distanceField
+
+    def getDiameter(self):
+        """ Finds the two farthest cells of the maze (the diameter of the spanning3) with two breadth-first passes.
+
+        |  1  THE farthest cell from any cell IS one end of a diameter (a property of trees)
+        |  2  THE farthest cell from this end IS the other end
+
+        The two passes find the hardest pair only in a perfect maze: after braid the maze has loops and 1 doesn't hold,
+        so both cells are far apart, but not necessarily the farthest pair (their length is still their exact shortest
+        distance).
+
+        :return: (cellIdA, cellIdB, length) with the path-length between both cells
+        """
+        if self._diameter is None:
+            farthestId = DistanceField(self._spanning3, self.maze.getNode(self.startX, self.startY)).getFarthestCellId()
+            self._distanceField = DistanceField(self._spanning3, self.maze.getNodeById(farthestId))             # 2
+            self._diameter = (farthestId, self._distanceField.getFarthestCellId(),
+                              self._distanceField.getEccentricity())
+        return self._diameter
+
+    def getEndpoints(self, length=0):
+        """ Places a start- and a target-cell with the requested solution-path-length between them.
+
+        |  1  IF the length is 0 or exceeds the diameter THEN return both ends of the diameter (the hardest pair)
+        |  2  PICK a random target AND a random cell at the length from it as start
+        |  3  IF no cell is that far from the target THEN use an end of the diameter as target, because a cell at each
+        |     length up to the diameter lies on its path to the other end
+
+        :param length: the solution-path-length between both cells, 0 for the two farthest cells
+        :return: (startId, targetId)
+        """
+        if length < 0:
+            raise ValueError("length must not be negative, got {}".format(length))
+        endA, endB, diameter = self.getDiameter()
+        if length == 0 or length >= diameter:                                                                   # 1
+            return endA, endB
+        field = self.getDistanceField(self.rng.randint(0, self.maze.sizeX-2), self.rng.randint(0, self.maze.sizeY-2))
+        cellIds = field.getCellIdsAtDistance(length)                                                            # 2
+        if not cellIds:                                                                                         # 3
+            field = self.getDistanceField(endA % self.maze.sizeX, endA // self.maze.sizeX)
+            cellIds = field.getCellIdsAtDistance(length)
+        return self.rng.choice(cellIds), field.root
 
-    def getSpanning3(self) -> dict:
-        """ Returns a newly created copy of the spanning3 and not just a reference (shallow/deep copy) to the _spanning3.
+    def braid(self, loopRatio=0.5):
+        """ Turns the perfect maze into a braided maze with loops by removing a wall of dead-ends.
 
-        Creates a new dictionary-object copyOfSpanning3 and copies every object in the spanning3, which allocates more
-        memory. Does not reference to the original spanning3, no shallow or deep copy (deep didn't work as intented).
+        Afterwards there may be several paths between two cells: the RootedTree, LCAIndex and DistanceField become the
+        breadth-first tree of the maze (the DistanceField still holds the shortest distances, the LCAIndex and the
+        Pathfinder find a path, but not necessarily the shortest) and the ShortestPath finds shortest paths.
 
-        :return: A newly created copy of the spanning3 as a new dictionary-object, which does not reference to the
-         original spanning-tree.
+     |  1  FOR every dead-end (a cell with a single path) in random order
+     |  1.1  IF it's still a dead-end AND a random number is below loopRatio
+     |  1.1.1  REMOVE the wall to a neighbor, preferably to another dead-end, which braids two dead-ends at once
+
+        :param loopRatio: the share of the dead-ends removed, 0 keeps the maze perfect, 1 removes every dead-end
         """
-        copyOfSpanning3 = {}
-        for key in self._spanning3.keys():
-            copyOfSpanning3[key] = []
-            for item in self._spanning3[key]:
-                copyOfSpanning3[key].append(item)
-        return copyOfSpanning3
-        # return copy.deepcopy(self._spanning3)  # ← ← ← deepcopy didn't work!
+        if not 0 <= loopRatio <= 1:
+            raise ValueError("loopRatio must be between 0 and 1, got {}".format(loopRatio))
+        self._links = links = bytearray(self._spanning3.links)
+        sizeX, steps = self.maze.sizeX, (1, self.maze.sizeX, -1, -self.maze.sizeX)
+        deadEnds = [cellId for cellId, cellLinks in enumerate(links) if cellLinks in SINGLE_LINKS]
+        self.rng.shuffle(deadEnds)                                                                      # 1
+        for cellId in deadEnds:
+            if links[cellId] not in SINGLE_LINKS or self.rng.random() >= loopRatio:                     # 1.1
+                continue
+            walledDirections = [direction for neighborX, neighborY, direction
+                                in self.maze.getNeighbors(cellId % sizeX, cellId // sizeX)
+                                if not links[cellId] >> direction & 1]
+            deadEndDirections = [direction for direction in walledDirections
+                                 if links[cellId + steps[direction]] in SINGLE_LINKS]
+            self._carve(cellId, self.rng.choice(deadEndDirections or walledDirections))                 # 1.1.1
+        self._spanning3, self._links = Spanning3(self.maze, links), None
+        self._rootedTree, self._lcaIndex, self._distanceField, self._diameter = None, None, None, None
+        self.isPerfect = False
+        if self.maze.cells is not None:          # the rendered cells show the removed walls only after rebuilding
+            self.maze.setCells()
+
+    def _carve(self, cellId, direction):
+        """ Removes the wall between the cell and its neighbor in the direction and links both in the spanning3.
+
+        :return: the cell-id of the neighbor
+        """
+        walls, sizeX = self.maze.walls, self.maze.sizeX
+        match direction:
+            case 0: # right
+                neighborId = cellId + 1
+                walls[neighborId] &= ~WEST
+            case 1: # down
+                neighborId = cellId + sizeX
+                walls[neighborId] &= ~NORTH
+            case 2: # left
+                neighborId = cellId - 1
+                walls[cellId] &= ~WEST
+            case _: # up
+                neighborId = cellId - sizeX
+                walls[cellId] &= ~NORTH
+        self._links[cellId] |= 1 << direction
+        self._links[neighborId] |= 1 << (direction + 2) % 4
+        return neighborId
 
     def _generateMaze(self):
         """ Generates maze with the iterative algorithm of randomized depth-first search with backtracking (uses stack).
 
-        While generating the maze the spanning-tree (_spanning3) of the maze is also built. The _spanning3 is a
-        dictionary, which stores a node as the key and a list as the value of the key in which only valid path-Nodes are
-        stored.
+        While generating the maze the spanning-tree (_spanning3) of the maze is also built. Every carved path is stored
+        as a direction-bit in a bytearray per cell-id, which is frozen into the read-only Spanning3 (CSR-arrays) after
+        the generation.
                                                                          \n
         The _spanning3 is needed for finding the solution-path of the maze and for the maze-game, where it's used to
-        validate the intended player movement direction by checking, if destination-node exists in the key-node
-        value-list.
+        validate the intended player movement direction by testing, if the path to the destination-cell is linked.
                                                                     \n
                                                                                         \n
         1  Choose the initial cell*, mark it as visited and push it to the stack        \n
@@ -51,93 +204,727 @@ class Generator:
         Iterative-implementation-pseudo-code-source_                                                             \n
         .. _Iterative-implementation-pseudo-code-source: https://en.wikipedia.org/wiki/Maze_generation_algorithm#:~:text=in%20the%20area.-,Iterative%20implementation,-%5Bedit%5D
         """
+        maze, walls = self.maze, self.maze.walls
         stack = Stack()
-        currentNode: Node = self.maze.getNode(self.startX, self.startY)     # 1
-        currentNode.setVisited(True)                         # 1
-        stack.push(currentNode)                              # 1
-        self._spanning3[currentNode]:list[Node] = []
-
-        while stack.isNotEmpty():                            # 2
-            currentNode = stack.pop()                        # 2.1
-            if currentNode.hasNeighbors():                   # 2.2
-                stack.push(currentNode)                      # 2.2.1
-
-                x, y, direction = random.choice(currentNode.getNeighbors()) # 2.2.2
-                currentNode.getNeighbors().remove((x, y, direction))        # 2.2.2
-                nextNode: Node = self.maze.getNode(x, y)                    # 2.2.2
-
-                if not nextNode.isVisited():                 # 2.2
-                    match direction:                         # 2.2.3
-                        case 0: # right
-                            nextNode.setWest(False)
-                        case 1: # down
-                            nextNode.setNorth(False)
-                        case 2: # left
-                            currentNode.setWest(False)
-                        case 3: # up
-                            currentNode.setNorth(False)
-
-                    self._spanning3[currentNode].append(nextNode)
-                    if nextNode in self._spanning3:
-                        self._spanning3[nextNode].append(currentNode)
-                    else:
-                        self._spanning3[nextNode] = [currentNode]
-
-                    nextNode.setVisited(True)                # 2.2.4
-                    stack.push(nextNode)                     # 2.2.4
+        currentId = maze.getId(self.startX, self.startY)            # 1
+        walls[currentId] |= VISITED                                  # 1
+        stack.push(currentId)                                        # 1
+
+        while stack.isNotEmpty():                                    # 2
+            currentId = stack.pop()                                  # 2.1
+            currentX, currentY = currentId % maze.sizeX, currentId // maze.sizeX
+            unvisitedNeighbors = [(x, y, direction) for x, y, direction in maze.getNeighbors(currentX, currentY)
+                                  if not walls[y * maze.sizeX + x] & VISITED]
+            if unvisitedNeighbors:                                   # 2.2
+                stack.push(currentId)                                # 2.2.1
+                x, y, direction = self.rng.choice(unvisitedNeighbors)  # 2.2.2
+                nextId = self._carve(currentId, direction)           # 2.2.3
+                walls[nextId] |= VISITED                             # 2.2.4
+                stack.push(nextId)                                   # 2.2.4
+
+    def _generateKruskal(self):
+        """ Generates the maze with the randomized Kruskal's algorithm.
+
+     |  1  SHUFFLE all inner walls (every cell has a wall to the right and one below)
+     |  2  FOR every wall: IF the cells divided by the wall are in different sets (UnionFind)
+     |  2.1  REMOVE the wall and JOIN the sets of both cells
+        """
+        sizeX, sizeY = self.maze.sizeX - 1, self.maze.sizeY - 1
+        edges = [(y * (sizeX+1) + x, 0) for y in range(sizeY) for x in range(sizeX - 1)] \
+              + [(y * (sizeX+1) + x, 1) for y in range(sizeY - 1) for x in range(sizeX)]
+        self.rng.shuffle(edges)                                                       # 1
+        sets, remaining = UnionFind(len(self.maze.walls)), sizeX * sizeY - 1
+        for cellId, direction in edges:                                             # 2
+            if sets.union(cellId, cellId + (1 if direction == 0 else sizeX+1)):     # 2.1
+                self._carve(cellId, direction)
+                remaining -= 1
+                if remaining == 0:
+                    break
+
+    def _generateWilson(self):
+        """ Generates a uniform spanning-tree (every perfect maze is equally likely) with Wilson's algorithm.
+
+     |  1  ADD the start-cell to the maze
+     |  2  FOR every cell, which isn't part of the maze
+     |  2.1  WALK randomly until the walk hits the maze, remember the last direction the walk left each cell in
+     |  2.2  FOLLOW the remembered directions from the cell to the maze, which erases every loop of the walk
+     |  2.3  CARVE the loop-erased walk and ADD its cells to the maze
+        """
+        maze, sizeX = self.maze, self.maze.sizeX
+        inMaze, walkDirections = bytearray(len(maze.walls)), bytearray(len(maze.walls))
+        inMaze[maze.getId(self.startX, self.startY)] = 1                             # 1
+        for y in range(maze.sizeY - 1):
+            for x in range(sizeX - 1):                                               # 2
+                cellId, walkX, walkY = y * sizeX + x, x, y
+                while not inMaze[walkY * sizeX + walkX]:                             # 2.1
+                    walkId = walkY * sizeX + walkX
+                    walkX, walkY, walkDirections[walkId] = self.rng.choice(maze.getNeighbors(walkX, walkY))
+                while not inMaze[cellId]:                                            # 2.2
+                    inMaze[cellId] = 1                                               # 2.3
+                    cellId = self._carve(cellId, walkDirections[cellId])
+
+    def _generatePrim(self):
+        """ Generates the maze with the randomized Prim's algorithm, which grows the maze from the start-cell.
+
+     |  1  ADD the start-cell to the maze and its neighbors to the frontier
+     |  2  WHILE the frontier isn't empty
+     |  2.1  REMOVE a random cell from the frontier
+     |  2.2  CARVE a path to one of its random neighbors in the maze and ADD the cell to the maze
+     |  2.3  ADD its neighbors, which are neither in the maze nor in the frontier, to the frontier
+        """
+        maze, sizeX = self.maze, self.maze.sizeX
+        state = bytearray(len(maze.walls))       # 0: unvisited, 1: in the frontier, 2: in the maze
+        frontier = []
+        x, y = self.startX, self.startY
+        while True:
+            state[y * sizeX + x] = 2                                                 # 1, 2.2
+            for neighborX, neighborY, direction in maze.getNeighbors(x, y):         # 1, 2.3
+                if state[neighborY * sizeX + neighborX] == 0:
+                    state[neighborY * sizeX + neighborX] = 1
+                    frontier.append((neighborX, neighborY))
+            if not frontier:                                                         # 2
+                break
+            index = self.rng.randrange(len(frontier))                                  # 2.1
+            frontier[index], frontier[-1] = frontier[-1], frontier[index]
+            x, y = frontier.pop()
+            cellId = y * sizeX + x
+            self._carve(cellId, self.rng.choice([direction for neighborX, neighborY, direction
+                                               in maze.getNeighbors(x, y)
+                                               if state[neighborY * sizeX + neighborX] == 2]))   # 2.2
+
+    def _generateSidewinder(self):
+        """ Generates the maze row by row with the sidewinder algorithm, the first row is one corridor.
+
+     |  1  FOR every cell of a row: ADD the cell to the current run of cells
+     |  1.1  IF it's the last cell of the row OR randomly (never in the first row): CARVE up from a random cell of the
+     |        run and START a new run
+     |  1.2  ELSE: CARVE to the right
+        """
+        sizeX = self.maze.sizeX
+        for y in range(self.maze.sizeY - 1):
+            runStart = 0
+            for x in range(sizeX - 1):                                               # 1
+                if y > 0 and (x == sizeX - 2 or self.rng.getrandbits(1)):              # 1.1
+                    self._carve(y * sizeX + self.rng.randint(runStart, x), 3)
+                    runStart = x + 1
+                elif x < sizeX - 2:                                                  # 1.2
+                    self._carve(y * sizeX + x, 0)
+
+    def _generateBinaryTree(self):
+        """ Generates the maze with the binary tree algorithm: every cell carves a path either up or to the left
+        (cells of the first row only to the left and of the first column only up). """
+        sizeX = self.maze.sizeX
+        for y in range(self.maze.sizeY - 1):
+            for x in range(sizeX - 1):
+                if x > 0 and y > 0:
+                    self._carve(y * sizeX + x, 2 + self.rng.getrandbits(1))
+                elif x > 0 or y > 0:
+                    self._carve(y * sizeX + x, 2 if x > 0 else 3)
+
+    def _generateTiles(self, tileSize, workers):
+        """ Splits the maze into tiles, generates every tile as its own perfect maze in a pool of worker processes and
+        stitches the tiles to one perfect maze.
+
+     |  1  GENERATE every tile with depth-first search in parallel (each tile is a spanning-tree with closed borders)
+     |  2  COPY the walls and links of every tile into the maze
+     |  3  SHUFFLE the borders between adjacent tiles
+     |  4  FOR every border: IF the tiles are in different sets (UnionFind over the tiles)
+     |  4.1  REMOVE one random wall of the border and JOIN the sets of both tiles
+
+        As exactly one wall is removed between the tiles of a spanning-tree over the tiles, the maze is connected and
+        has no loops.
+        """
+        maze, sizeX = self.maze, self.maze.sizeX
+        columns = [(x, min(tileSize, sizeX - 1 - x)) for x in range(0, sizeX - 1, tileSize)]
+        rows = [(y, min(tileSize, maze.sizeY - 1 - y)) for y in range(0, maze.sizeY - 1, tileSize)]
+        tiles = [(x, y, width, height) for y, height in rows for x, width in columns]
+        tasks = [(width, height, self.rng.getrandbits(63)) for x, y, width, height in tiles]
+        if len(tasks) == 1 or workers == 1:
+            results = map(generateTile, tasks)
+        else:
+            with Pool(workers) as pool:                                              # 1
+                results = pool.map(generateTile, tasks)
+        for (x, y, width, height), (tileWalls, tileLinks) in zip(tiles, results):     # 2
+            for row in range(height):
+                cellId = (y + row) * sizeX + x
+                maze.walls[cellId:cellId + width] = tileWalls[row * width:(row + 1) * width]
+                self._links[cellId:cellId + width] = tileLinks[row * width:(row + 1) * width]
+
+        borders = [(index, index + 1, 0) for index in range(len(tiles)) if (index + 1) % len(columns) != 0] \
+                + [(index, index + len(columns), 1) for index in range(len(tiles) - len(columns))]
+        self.rng.shuffle(borders)                                                      # 3
+        sets = UnionFind(len(tiles))
+        for tileA, tileB, direction in borders:                                      # 4
+            if sets.union(tileA, tileB):                                             # 4.1
+                x, y, width, height = tiles[tileA]
+                if direction == 0:          # from the last column of tileA to the right
+                    self._carve((y + self.rng.randrange(height)) * sizeX + x + width - 1, 0)
+                else:                       # from the last row of tileA down
+                    self._carve((y + height - 1) * sizeX + x + self.rng.randrange(width), 1)
+
+
+def generateTile(task) -> tuple:
+    """ Generates one tile of Generator._generateTiles as a maze of its own with depth-first search (in a worker).
+
+    :param task: (width, height, seed) of the tile
+    :return: the walls and the links of the tile's cells row by row without its east and south boundary
+    """
+    width, height, seed = task
+    tile = Maze(width, height, seed=seed)
+    tileLinks = Generator(tile).getSpanning3().links
+    rows = range(0, height * (width + 1), width + 1)
+    return b"".join(tile.walls[row:row + width] for row in rows), b"".join(tileLinks[row:row + width] for row in rows)
+
+
+class EllerGenerator:
+    def __init__(self, sizeX, sizeY, seed=None):
+        """ Generates a perfect maze row by row with Eller's algorithm, which needs only O(sizeX) memory.
+
+        The rows are produced lazily by getRows in the format of Maze.walls, so a maze of any height can be streamed
+        straight to a file or the console (see model.writeRows) without ever holding the whole maze.
+
+        :param sizeX: cell count of the x-axis (like Maze)
+        :param sizeY: cell count of the y-axis (like Maze)
+        :param seed: the seed of the random generator, a random seed if None
+        """
+        self.sizeX, self.sizeY = sizeX, sizeY
+        self.seed = random.getrandbits(63) if seed is None else seed
+        self.rng = random.Random(self.seed)
+
+    def getRows(self):
+        """ Yields every row of the maze as a bytearray of NORTH- and WEST-bits for the sizeX cells and the east
+        boundary cell, followed by the south boundary row.
+
+     |  1  PUT every cell of the first row into its own set
+     |  2  FOR every row
+     |  2.1  JOIN randomly (in the last row: always) adjacent cells of different sets by removing the wall between
+     |  2.2  CHOOSE randomly for every set at least one cell (none in the last row), which is connected to the cell below
+     |  2.3  KEEP the set of connected cells in the next row, PUT every other cell of the next row into a new set
+
+        Eller's-algorithm-source_
+        .. _Eller's-algorithm-source: http://www.neocomputer.org/projects/eller.html
+        """
+        sizeX, nextSetId, rng = self.sizeX, self.sizeX, self.rng
+        sets = list(range(sizeX))                                            # 1
+        north = bytearray([NORTH]) * sizeX                                   # walls above the current row
+        for y in range(self.sizeY):                                          # 2
+            isLastRow = y == self.sizeY - 1
+            row = bytearray(sizeX + 1)
+            row[sizeX] = WEST                                                # east boundary cell
+            members = {}
+            for x in range(sizeX):
+                members.setdefault(sets[x], []).append(x)
+            for x in range(sizeX):                                           # 2.1
+                row[x] = north[x] | WEST
+                if x > 0 and sets[x] != sets[x-1] and (isLastRow or rng.getrandbits(1)):
+                    row[x] &= ~WEST
+                    keptSet, mergedSet = sorted((sets[x-1], sets[x]), key=lambda setId: -len(members[setId]))
+                    for column in members.pop(mergedSet):
+                        sets[column] = keptSet
+                        members[keptSet].append(column)
+            yield row
+
+            if not isLastRow:
+                north = bytearray([NORTH]) * sizeX
+                for columns in members.values():                             # 2.2
+                    downColumns = [column for column in columns if rng.getrandbits(1)]
+                    for column in downColumns or [rng.choice(columns)]:
+                        north[column] = 0
+                for x in range(sizeX):                                       # 2.3
+                    if north[x]:
+                        sets[x], nextSetId = nextSetId, nextSetId + 1
+
+        yield bytearray([NORTH]) * sizeX + bytearray(1)                      # south boundary row
+
+
+class RootedTree:
+    def __init__(self, spanning3:Spanning3, root:Node):
+        """ Roots the spanning-tree of the maze once at the root-node by storing a parent-pointer and the depth per cell.
+
+        Both arrays are indexed by the cell-id (see Maze.getId), the root's parent is -1. As the maze is a perfect maze
+        (the spanning3 is a tree), the only path between two cells leads over their lowest common ancestor.
+
+        :param spanning3: the read-only spanning-tree of the maze
+        :param root: the Node at which the tree is rooted
+        """
+        self.maze, self.root = root.maze, root.getId()
+        cellCount = self.maze.sizeX * self.maze.sizeY
+        self.parents = array('l', [-1]) * cellCount
+        self.depths = array('l', [0]) * cellCount
+        self.order = array('l')                  # cell-ids in breadth-first order, parents before their children
+        self._setParents(spanning3, root)
+
+    @timed("rooted_tree.bfs")
+    def _setParents(self, spanning3:Spanning3, root:Node):
+        parents, depths = self.parents, self.depths
+        queue = [root.getId()]
+        rootId = queue[0]
+        for nodeId in queue:                     # breadth-first: the queue grows while iterating over it
+            for childId in spanning3.getNeighbors(nodeId):
+                if parents[childId] == -1 and childId != rootId:   # unvisited (a braided maze has loops)
+                    parents[childId], depths[childId] = nodeId, depths[nodeId] + 1
+                    queue.append(childId)
+        self.order.extend(queue)
+
+    def getParent(self, cellId):
+        return self.parents[cellId]
+
+    def getDepth(self, cellId):
+        return self.depths[cellId]
+
+    def _checkCellIds(self, *cellIds):
+        """ :raise ValueError: if a cell-id isn't a cell of the tree, e.g. a boundary-cell, whose walk up never ends """
+        for cellId in cellIds:
+            if not (0 <= cellId < len(self.parents) and (self.parents[cellId] != -1 or cellId == self.root)):
+                raise ValueError("cell {} isn't a cell of the rooted tree".format(cellId))
+
+    def getPath(self, startId, targetId) -> list:
+        """ Walks up from both cells to their lowest common ancestor, which takes O(path length) steps.
+
+        :return: the cell-ids of the path from startId to targetId, both included
+        :raise ValueError: if a cell-id isn't a cell of the tree
+        """
+        self._checkCellIds(startId, targetId)
+        parents, depths = self.parents, self.depths
+        startSide, targetSide = [startId], [targetId]
+        while depths[startId] > depths[targetId]:
+            startId = parents[startId]
+            startSide.append(startId)
+        while depths[targetId] > depths[startId]:
+            targetId = parents[targetId]
+            targetSide.append(targetId)
+        while startId != targetId:
+            startId, targetId = parents[startId], parents[targetId]
+            startSide.append(startId)
+            targetSide.append(targetId)
+        targetSide.pop()                         # the common ancestor is already the last cell of the startSide
+        targetSide.reverse()
+        return startSide + targetSide
+
+
+class LCAIndex(RootedTree):
+    def __init__(self, spanning3:Spanning3, root:Node):
+        """ Index over the rooted spanning-tree to answer distance- and path-queries between arbitrary pairs of cells.
+
+        The tree is decomposed into heavy paths: every cell continues the path of its parent, if it's the child with
+        the biggest subtree, otherwise it starts a new path. Any walk to the root crosses at most O(log n) of these
+        paths, so the lowest common ancestor (LCA) of two cells is found in O(log n) steps, while the index only
+        needs one more int-array (the head of each cell's path) on top of the parents and depths.
+
+        :param spanning3: the read-only spanning-tree of the maze
+        :param root: the Node at which the tree is rooted
+        """
+        super().__init__(spanning3, root)
+        self.heads = array('l', [-1]) * len(self.parents)
+        self._setHeavyPaths()
+
+    @timed("lca_index.heavy_paths")
+    def _setHeavyPaths(self):
+        parents, heads, order = self.parents, self.heads, self.order
+        subtreeSizes = array('l', [1]) * len(parents)
+        heavyChildren = array('l', [-1]) * len(parents)
+        for cellId in reversed(order):
+            parentId = parents[cellId]
+            if parentId != -1:
+                subtreeSizes[parentId] += subtreeSizes[cellId]
+                heavyChild = heavyChildren[parentId]
+                if heavyChild == -1 or subtreeSizes[cellId] > subtreeSizes[heavyChild]:
+                    heavyChildren[parentId] = cellId
+        for cellId in order:
+            parentId = parents[cellId]
+            heads[cellId] = heads[parentId] if parentId != -1 and heavyChildren[parentId] == cellId else cellId
+
+    def getLCA(self, cellIdA, cellIdB):
+        """ :return: the cell-id of the lowest common ancestor of both cells in O(log n) steps
+            :raise ValueError: if a cell-id isn't a cell of the tree """
+        self._checkCellIds(cellIdA, cellIdB)
+        parents, depths, heads = self.parents, self.depths, self.heads
+        while heads[cellIdA] != heads[cellIdB]:
+            if depths[heads[cellIdA]] > depths[heads[cellIdB]]:
+                cellIdA = parents[heads[cellIdA]]
+            else:
+                cellIdB = parents[heads[cellIdB]]
+        return cellIdA if depths[cellIdA] < depths[cellIdB] else cellIdB
+
+    def getDistance(self, cellIdA, cellIdB):
+        """ :return: the count of steps of the only path between both cells """
+        ancestorId = self.getLCA(cellIdA, cellIdB)                # checks the cell-ids first
+        return self.depths[cellIdA] + self.depths[cellIdB] - 2 * self.depths[ancestorId]
+
+    def getDistances(self, pairs) -> array:
+        """ :param pairs: an iterable of (startId, targetId)-pairs
+            :return: the distance of every pair as an int-array in the order of the pairs """
+        return array('l', (self.getDistance(startId, targetId) for startId, targetId in pairs))
+
+    def getPath(self, startId, targetId) -> list:
+        """ Walks up from both cells to their already known lowest common ancestor in O(path length) steps.
+
+        :return: the cell-ids of the path from startId to targetId, both included
+        :raise ValueError: if a cell-id isn't a cell of the tree (see getLCA)
+        """
+        parents, ancestorId = self.parents, self.getLCA(startId, targetId)
+        startSide, targetSide = [startId], []
+        while startId != ancestorId:
+            startId = parents[startId]
+            startSide.append(startId)
+        while targetId != ancestorId:
+            targetSide.append(targetId)
+            targetId = parents[targetId]
+        targetSide.reverse()
+        return startSide + targetSide
+
+    def getPaths(self, pairs) -> list:
+        """ :param pairs: an iterable of (startId, targetId)-pairs
+            :return: the path of every pair as a list of cell-ids in the order of the pairs """
+        return [self.getPath(startId, targetId) for startId, targetId in pairs]
+
+
+class DistanceField(RootedTree):
+    def __init__(self, spanning3:Spanning3, target:Node):
+        """ Stores the distance of every cell to the target, built with one breadth-first pass in O(cells).
+
+        It's the spanning3 rooted at the target: the depth of a cell is the length of its solution-path and its parent
+        is the next step towards the target. So solution-lengths, hints and "getting warmer"-feedback of a player are
+        O(1) lookups in two int-arrays instead of solving the maze.
+
+        :param spanning3: the read-only spanning-tree of the maze
+        :param target: the target Node, which all distances are measured to
+        """
+        super().__init__(spanning3, target)
+
+    def getDistance(self, cellId):
+        return self.depths[cellId]
+
+    def getNextCellId(self, cellId):
+        """ :return: the cell-id of the next step from the cell towards the target (the hint), -1 at the target """
+        return self.parents[cellId]
+
+    def isWarmer(self, fromCellId, toCellId):
+        """ :return: True, if the move from fromCellId to toCellId brings the player closer to the target """
+        return self.depths[toCellId] < self.depths[fromCellId]
+
+    def getFarthestCellId(self):
+        return self.order[-1]                    # the breadth-first order ends with the deepest cell
+
+    def getEccentricity(self):
+        """ :return: the distance of the farthest cell from the target """
+        return self.depths[self.order[-1]]
+
+    def getCellIdsAtDistance(self, distance) -> list:
+        """ Bisects the breadth-first order, which is sorted by distance, in O(log n) plus the count of cells found. """
+        depth = self.depths.__getitem__
+        return list(self.order[bisect_left(self.order, distance, key=depth):
+                               bisect_right(self.order, distance, key=depth)])
 
 
 class Pathfinder:
-    def __init__(self, spanning3:dict, start:Node, target:Node):
+    @timed("pathfinder.solve")
+    def __init__(self, rootedTree:RootedTree, start:Node, target:Node):
         """ Finds the solution-path of the maze.
 
-        :param spanning3: the spanning-tree of the maze to find a solution path from start-node to target-node as a dictionary
+        :param rootedTree: the rooted spanning-tree (or its LCAIndex) of the maze to find a solution path from
+         start-node to target-node
         :param start: the current Node position in the maze of the player
         :param target: the target Node in the maze
         """
         self.solutionPathStack = Stack()
-        self._setSolutionPath(spanning3, start, target)
+        self._setSolutionPath(rootedTree, start, target)
 
     def getSolutionPath(self):
         return self.solutionPathStack.getItems()
 
-    def _setSolutionPath(self, spanning3:dict, startNode:Node, targetNode:Node):
-        """ Finds the Solution-Path from Players current position (currentNode) to the target position (targetNode) by using only the spanning-tree (spanning3) of the maze.
+    def _setSolutionPath(self, rootedTree:RootedTree, startNode:Node, targetNode:Node):
+        """ Finds the Solution-Path from Players current position (startNode) to the target position (targetNode) by using only the rooted spanning-tree of the maze.
 
-     |  The spanning3-dictionary stores a node as the key and a list as the value of the key-node in which only valid
-     |  path-Nodes are stored. While searching for the solution, this copy of the spanning3 gets destroyed.
+     |  The rootedTree stores a parent-pointer per cell and isn't modified, so the same rootedTree is shared by every
+     |  search. As there is only one path between two cells of a perfect maze, the search is deterministic and takes
+     |  O(path length) steps.
      |
      |  A stack is used to store the Nodes of the solution-path.
      |
-     |  1  PUSH the currentNode to the solutionPath (stack)
-     |  2  WHILE the nextNode is not equal to the targetNode
-     |  2.1  POP a Node from the stack and make it a current Node
-     |  2.2  IF the current Node has any connection to other Nodes
-     |  2.2.1  PUSH the currentNode to the stack
-     |  2.2.2  CHOOSE a random path from currentNode as nextNode
-     |  2.2.3  PUSH the nextNode to the stack
-     |  2.2.4  REMOVE the path from currentNode to nextNode
-     |  2.2.5  REMOVE the path from nextNode to currentNode
+     |  1  WALK up from startNode and targetNode to their lowest common ancestor
+     |  2  PUSH every Node of the path from startNode to targetNode to the stack
      |  3  REMOVE the first Node from the stack
      |  4  REMOVE the last Node from the stack
 
-        :param spanning3: the spanning-tree of the maze to find a solution path from currentNode to targetNode as a dictionary
+        :param rootedTree: the rooted spanning-tree of the maze to find a solution path from startNode to targetNode
         :param startNode: the current Node position in the maze of the player
         :param targetNode: the target Node in the maze
         """
-        nextNode:Node = startNode
-        self.solutionPathStack.push(startNode)             # 1
+        maze = startNode.maze
+        for cellId in rootedTree.getPath(startNode.getId(), targetNode.getId()):   # 1
+            self.solutionPathStack.push(maze.getNodeById(cellId))                   # 2
 
-        while nextNode != targetNode:                      # 2
-            currentNode = self.solutionPathStack.pop()       # 2.1
+        self.solutionPathStack.pop(0)                      # 3 ~ is where PLY is marked in the maze
+        self.solutionPathStack.pop()                       # 4 ~ is where END is marked in the maze
 
-            if len(spanning3[currentNode]) != 0:             # 2.2
-                self.solutionPathStack.push(currentNode)         # 2.2.1
-                nextNode = random.choice(spanning3[currentNode]) # 2.2.2
-                self.solutionPathStack.push(nextNode)            # 2.2.3
 
-                spanning3[currentNode].remove(nextNode)          # 2.2.4
-                spanning3[nextNode].remove(currentNode)          # 2.2.5
+class IncrementalPath:
+    def __init__(self, path):
+        """ Keeps the solution-path from the player's position to the target up to date while the player moves.
 
-        self.solutionPathStack.pop(0)                      # 3 ~ is where PLY is marked in the maze
-        self.solutionPathStack.pop()                       # 4 ~ is where END is marked in the maze
\ No newline at end of file
+        As there is only one path between two cells of a perfect maze, a move onto the next cell of the path shortens
+        the path by this cell, while any other move lengthens the path by the cell the player left. So every move
+        costs O(1) instead of solving the maze again.
+
+        :param path: the cell-ids of the solution-path from the player's position to the target, both included
+        """
+        self.cells = deque(path[1:])             # the cells ahead of the player, the target is the last one
+
+    def move(self, fromCellId, toCellId):
+        """ Updates the path after the player moved from fromCellId to the neighboring toCellId. """
+        if self.cells and self.cells[0] == toCellId:
+            self.cells.popleft()
+        else:
+            self.cells.appendleft(fromCellId)
+
+    def getStepsRemaining(self):
+        return len(self.cells)
+
+    def getNextCellId(self):
+        """ :return: the cell-id of the next step on the solution-path (the hint), None at the target """
+        return self.cells[0] if self.cells else None
+
+    def getSolutionPath(self) -> list:
+        """ :return: the cell-ids of the path ahead without the target, like Pathfinder.getSolutionPath """
+        return list(self.cells)[:-1]
+
+
+class FieldPath:
+    def __init__(self, distanceField, cellId):
+        """ The solution-path from the player's position to the target of any maze, also of a braided maze with loops.
+
+        IncrementalPath relies on the only path of a perfect maze. With loops a detour may lead to a shorter path, so
+        the path isn't stored: the DistanceField of the target holds the shortest distance of every cell and its next
+        step towards the target, so a move costs O(1) and the path is followed on demand.
+
+        :param distanceField: the DistanceField rooted at the target
+        :param cellId: the cell-id of the player's position
+        """
+        self.distanceField, self.cellId = distanceField, cellId
+
+    def move(self, fromCellId, toCellId):
+        """ Updates the path after the player moved from fromCellId to the neighboring toCellId. """
+        self.cellId = toCellId
+
+    def getStepsRemaining(self):
+        return self.distanceField.getDistance(self.cellId)
+
+    def getNextCellId(self):
+        """ :return: the cell-id of the next step on the solution-path (the hint), None at the target """
+        nextCellId = self.distanceField.getNextCellId(self.cellId)
+        return None if nextCellId == -1 else nextCellId
+
+    def getSolutionPath(self) -> list:
+        """ :return: the cell-ids of the path ahead without the target, like IncrementalPath.getSolutionPath """
+        path, cellId = [], self.distanceField.getNextCellId(self.cellId)
+        while cellId != -1 and cellId != self.distanceField.root:
+            path.append(cellId)
+            cellId = self.distanceField.getNextCellId(cellId)
+        return path
+
+
+class ShortestPath:
+    def __init__(self, spanning3:Spanning3, weights=None):
+        """ Shortest-path engine for any maze, also braided mazes with loops, which the tree-based solvers can't solve.
+
+        Every query reuses the same compact arrays: a visited-mark per cell holds the number of the query (and for the
+        bidirectional search its side), so a new query starts without clearing O(cells) arrays and costs only the
+        cells it visits.
+
+        :param spanning3: the paths of the maze (after Generator.braid with loops)
+        :param weights: the cost to enter each cell by cell-id (at least 1), i.e. of getRandomWeights, every step costs
+         1 if None (only used by aStar)
+        """
+        self.links, self.weights, sizeX = spanning3.links, weights, spanning3.sizeX
+        # the id-offsets to the neighbors of a cell by its links, which is cheaper than slicing the CSR-arrays
+        self.linkSteps = tuple(tuple(step for direction, step in enumerate((1, sizeX, -1, -sizeX))
+                                     if cellLinks >> direction & 1) for cellLinks in range(16))
+        self.sizeX, cellCount = sizeX, len(self.links)
+        self.marks = array('L', [0]) * cellCount  # the cell was visited in the query (or its side) with this mark
+        self.parents = array('l', [-1]) * cellCount
+        self.costs = array('L', [0]) * cellCount
+        self.minWeight = 1 if weights is None else max(1, min(weights))
+        self._query = 0
+
+    def _nextMark(self):
+        self._query += 2                         # 2 marks per query: forward and backward search
+        return self._query
+
+    def _getPath(self, cellId) -> list:
+        # follows the parents from the cell back to the start of its search, whose parent is -1
+        path = [cellId]
+        while self.parents[cellId] != -1:
+            cellId = self.parents[cellId]
+            path.append(cellId)
+        path.reverse()
+        return path
+
+    @timed("shortest_path.astar")
+    def aStar(self, startId, targetId) -> list:
+        """ Finds the cheapest path with A* and the Manhattan-distance (times the smallest weight) as heuristic.
+
+     |  1  PUSH the start with its estimated cost to the priority queue (a binary heap)
+     |  2  WHILE the queue isn't empty
+     |  2.1  POP the cell with the lowest estimated cost, skip it if a cheaper path to it was found in the meantime
+     |  2.2  IF it's the target THEN return the path
+     |  2.3  FOR every neighbor: IF the path over the cell is cheaper THEN store the cost and parent and PUSH it
+
+        As the heuristic never overestimates and is consistent, the first time the target is popped its path is the
+        cheapest one.
+
+        :return: the cell-ids of the path from startId to targetId, both included, an empty list if there's no path
+        """
+        mark, sizeX, weights = self._nextMark(), self.sizeX, self.weights
+        marks, parents, costs, links, linkSteps = self.marks, self.parents, self.costs, self.links, self.linkSteps
+        targetX, targetY, minWeight = targetId % sizeX, targetId // sizeX, self.minWeight
+        marks[startId], parents[startId], costs[startId] = mark, -1, 0
+        # queue-entries: (estimated cost, heuristic, cell-id), of equally estimated cells the one nearer to the target
+        # is expanded first, so on a straight way to the target A* doesn't spread over all cells of the same estimate
+        queue = [(0, 0, startId)]                                                                      # 1
+        while queue:                                                                                   # 2
+            estimate, heuristic, cellId = heapq.heappop(queue)                                         # 2.1
+            cost = costs[cellId]
+            if estimate > cost + heuristic:
+                continue
+            if cellId == targetId:                                                                     # 2.2
+                return self._getPath(cellId)
+            for step in linkSteps[links[cellId]]:                                                      # 2.3
+                neighborId = cellId + step
+                neighborCost = cost + (1 if weights is None else weights[neighborId])
+                if marks[neighborId] != mark or neighborCost < costs[neighborId]:
+                    marks[neighborId], parents[neighborId], costs[neighborId] = mark, cellId, neighborCost
+                    heuristic = (abs(neighborId % sizeX - targetX) + abs(neighborId // sizeX - targetY)) * minWeight
+                    heapq.heappush(queue, (neighborCost + heuristic, heuristic, neighborId))
+        return []
+
+    @timed("shortest_path.bidirectional")
+    def bidirectionalBfs(self, startId, targetId) -> list:
+        """ Finds a shortest path (by steps, ignoring the weights) by breadth-first searches from both ends at once.
+
+     |  1  MARK the start as forward and the target as backward side
+     |  2  WHILE both frontiers aren't empty
+     |  2.1  EXPAND the smaller frontier by one level, every new cell gets the mark of its side and its parent
+     |  2.2  IF a neighbor has the mark of the other side THEN both searches met: return both halves of the path
+
+        Each search only has to reach half the distance, so far fewer cells are visited than by a single search.
+
+        :return: the cell-ids of the path from startId to targetId, both included, an empty list if there's no path
+        """
+        forwardMark = self._nextMark()
+        backwardMark = forwardMark + 1
+        marks, parents, links, linkSteps = self.marks, self.parents, self.links, self.linkSteps
+        marks[startId], parents[startId] = forwardMark, -1                                             # 1
+        marks[targetId], parents[targetId] = backwardMark, -1
+        if startId == targetId:
+            return [startId]
+        frontiers = {forwardMark: [startId], backwardMark: [targetId]}
+        while frontiers[forwardMark] and frontiers[backwardMark]:                                      # 2
+            mark = forwardMark if len(frontiers[forwardMark]) <= len(frontiers[backwardMark]) else backwardMark
+            otherMark, nextFrontier = mark ^ 1, []
+            for cellId in frontiers[mark]:                                                             # 2.1
+                for step in linkSteps[links[cellId]]:
+                    neighborId = cellId + step
+                    neighborMark = marks[neighborId]
+                    if neighborMark == otherMark:                                                      # 2.2
+                        forwardId, backwardId = (cellId, neighborId) if mark == forwardMark else (neighborId, cellId)
+                        backwardHalf = self._getPath(backwardId)
+                        backwardHalf.reverse()
+                        return self._getPath(forwardId) + backwardHalf
+                    if neighborMark != mark:
+                        marks[neighborId], parents[neighborId] = mark, cellId
+                        nextFrontier.append(neighborId)
+            frontiers[mark] = nextFrontier
+        return []
+
+
+def getRandomWeights(maze, maxWeight=9, rng=None):
+    """ :return: a random cost from 1 to maxWeight to enter each cell by cell-id, for ShortestPath.aStar """
+    rng = maze.rng if rng is None else rng
+    return bytes(rng.randint(1, maxWeight) for _ in range(maze.sizeX * maze.sizeY))
+
+
+class OutOfCorePathfinder:
+    @timed("out_of_core.solve")
+    def __init__(self, maze:Maze, start:Node, target:Node, scratchDir=None):
+        """ Finds the solution-path of a perfect maze, which doesn't need to fit into memory (i.e. loaded by Maze.load).
+
+        The paths are derived from the wall-bits of the maze on the fly, no spanning3 is needed. The search is a
+        depth-first search without a stack: as the maze is a tree, it backtracks by following the parent-directions and
+        continues with the direction after the one it came back from. Only the parent-direction of every cell is
+        stored, with 2 bits per cell in a memory-mapped temporary file, so the memory of the search is bounded by the
+        pages the operating system keeps cached and not by the size of the maze.
+
+        :param maze: the perfect maze, its walls can be a bytearray or PackedWalls over a memory-mapped maze-file
+        :param start: the current Node position in the maze of the player
+        :param target: the target Node in the maze
+        :param scratchDir: the directory of the temporary parent-direction-file, the default temporary dir if None
+        """
+        self.maze, self.start, self.target = maze, start.getId(), target.getId()
+        self._scratchFile = tempfile.TemporaryFile(dir=scratchDir)
+        self._scratchFile.truncate((len(maze.walls) + 3) // 4)
+        # the 2-bit packing of the walls is reused to store one direction (0 to 3) per cell
+        self.parents = PackedWalls(mmap.mmap(self._scratchFile.fileno(), (len(maze.walls) + 3) // 4), 0,
+                                   len(maze.walls))
+        self._search()
+
+    def _isLinked(self, cellId, x, y, direction):
+        walls, sizeX = self.maze.walls, self.maze.sizeX
+        match direction:
+            case 0: # right
+                return x + 2 < sizeX and not walls[cellId + 1] & WEST
+            case 1: # down
+                return y + 2 < self.maze.sizeY and not walls[cellId + sizeX] & NORTH
+            case 2: # left
+                return x > 0 and not walls[cellId] & WEST
+            case _: # up
+                return y > 0 and not walls[cellId] & NORTH
+
+    def _search(self):
+        """
+     |  1  START at the start-cell with the first direction
+     |  2  WHILE the current cell isn't the target-cell
+     |  2.1  FIND the next linked direction of the current cell, which doesn't lead back to its parent
+     |  2.2  IF found: STORE the direction back as the parent-direction of the next cell and MOVE to it
+     |  2.3  ELSE: MOVE back to the parent and continue with the direction after the one leading to the current cell
+        """
+        sizeX, parents, steps = self.maze.sizeX, self.parents, (1, self.maze.sizeX, -1, -self.maze.sizeX)
+        cellId, direction = self.start, 0                                            # 1
+        y, x = divmod(cellId, sizeX)
+        while cellId != self.target:                                                 # 2
+            parentDirection = parents[cellId] if cellId != self.start else -1
+            while direction < 4 and (direction == parentDirection
+                                     or not self._isLinked(cellId, x, y, direction)):   # 2.1
+                direction += 1
+            if direction < 4:                                                        # 2.2
+                cellId += steps[direction]
+                parents[cellId] = (direction + 2) % 4
+                x, y, direction = x + DIRECTION_X[direction], y + DIRECTION_Y[direction], 0
+            elif cellId == self.start:
+                raise ValueError("the target-cell can't be reached from the start-cell")
+            else:                                                                    # 2.3
+                cellId += steps[parentDirection]
+                x, y = x + DIRECTION_X[parentDirection], y + DIRECTION_Y[parentDirection]
+                direction = (parentDirection + 2) % 4 + 1
+
+    def iterPathFromTarget(self):
+        """ Yields the cell-ids of the solution-path from the target-cell back to the start-cell (both included)
+        without holding the path in memory. """
+        steps, cellId = (1, self.maze.sizeX, -1, -self.maze.sizeX), self.target
+        yield cellId
+        while cellId != self.start:
+            cellId += steps[self.parents[cellId]]
+            yield cellId
+
+    def getPathLength(self):
+        """ :return: the count of steps of the solution-path """
+        return sum(1 for cellId in self.iterPathFromTarget()) - 1
+
+    def getSolutionPath(self):
+        """ :return: the Nodes of the solution-path between start and target (both excluded) like
+         Pathfinder.getSolutionPath, which holds the whole path in memory """
+        return [self.maze.getNodeById(cellId) for cellId in self.iterPathFromTarget()][-2:0:-1]
+
+    def close(self):
+        self.parents.data.close()
+        self._scratchFile.close()
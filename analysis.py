@@ -0,0 +1,136 @@
+from array import array
+from collections import Counter
+from model import NORTH, WEST, getMazeRows
+
+# the walls of a cell to the ASCII-digit of its link: "1" if the side is open
+NORTH_LINKS = bytes(ord("0") if cellWalls & NORTH else ord("1") for cellWalls in range(256))
+WEST_LINKS = bytes(ord("0") if cellWalls & WEST else ord("1") for cellWalls in range(256))
+LONG_RUN = 32                                # runs of links (straight corridors) are counted one by one from this length
+
+
+def _getLinkRows(rows, sizeX):
+    """ Yields the links of every row of cells as ASCII-digits: "1" for an open side, "0" for a wall.
+
+    :return: an iterator of (north, west, east, south)-links, sizeX digits each
+    """
+    rows = iter(rows)
+    row = next(rows)
+    for nextRow in rows:
+        yield (row[:sizeX].translate(NORTH_LINKS), row[:sizeX].translate(WEST_LINKS),
+               row[1:sizeX + 1].translate(WEST_LINKS),        # the east-wall of a cell is the west-wall of its neighbor
+               nextRow[:sizeX].translate(NORTH_LINKS))        # the south-wall is the north-wall of the cell below
+        row = nextRow                            # the last row is the south boundary and has no cells of its own
+
+def getMazeStats(rows, sizeX, sizeY, solutionLength=None, blockRows=256):
+    """ Computes the structure of a perfect maze in one streaming pass over its rows of walls.
+
+    The rows are processed in blocks of blockRows rows. Every side (north, west, east, south) of the cells of a block
+    is parsed into one big integer with one bit per cell, so the cells are analyzed bit-parallel by a few integer
+    operations running in C instead of a Python loop per cell:
+
+    |  1  ADD the four sides of every cell bit-sliced (a full adder over the integers), so the degree of every cell
+    |     is held by three integers, and COUNT each degree by int.bit_count: dead-ends (degree 1), corridor cells
+    |     (degree 2) and junctions (degree 3 and 4)
+    |  2  COUNT the straight cells, which are open to two opposite sides only
+    |  3  COUNT the lengths of the straight horizontal corridors (the runs of east-links)
+    |  4  COUNT the lengths of the straight vertical corridors over the columns of the block (strided slices), a
+    |     corridor open at the end of the block is carried over to the next block
+
+    So the memory stays O(sizeX * blockRows) and a streamed (EllerGenerator.getRows) or memory-mapped maze (getMazeRows
+    over Maze.load) is analyzed without holding it.
+
+    :param rows: an iterable of bytearrays with the NORTH- and WEST-bits of sizeX cells and the east boundary cell, the
+     last row is the south boundary (see EllerGenerator.getRows and getMazeRows)
+    :param sizeX: cell count of the x-axis without the boundary (like EllerGenerator)
+    :param sizeY: cell count of the y-axis without the boundary
+    :param solutionLength: the length of a solution-path (in steps) for the share of the cells on it, omitted if None
+    :return: the statistics as JSON-serializable dict
+    """
+    degrees, corridors = [0] * 5, Counter()
+    # corridors are counted by their links (the lengths of the runs), a corridor of n links is n + 1 cells long
+    carries = array('l', [0]) * sizeX            # per column: the links of the vertical corridor reaching the block
+    block, straightCells = [], 0
+    for index, links in enumerate(_getLinkRows(rows, sizeX), 1):
+        block.append(links)
+        if len(block) == blockRows or index == sizeY:
+            straightCells += _countBlock(block, sizeX, degrees, corridors, carries)
+            block = []
+    corridors.update(links for links in carries if links)
+
+    cellCount, junctions = sizeX * sizeY, degrees[3] + degrees[4]
+    stats = {"cells": cellCount, "degrees": degrees, "deadEnds": degrees[1], "corridorCells": degrees[2],
+             "junctions": junctions,
+             # ways onward at a junction, without the way back
+             "branchingFactor": (2 * degrees[3] + 3 * degrees[4]) / junctions if junctions else 0.0,
+             # share of the corridor cells leading straight on instead of turning
+             "straightness": straightCells / degrees[2] if degrees[2] else 0.0,
+             # corridor cells per dead-end: few long branches flow like a river, many short ones make it twisty
+             "riverFactor": degrees[2] / degrees[1] if degrees[1] else 0.0,
+             "corridorLengths": {links + 1: count for links, count in sorted(corridors.items()) if count}}
+    if solutionLength is not None:
+        stats["solutionShare"] = (solutionLength + 1) / cellCount
+    return stats
+
+def _countBlock(block, sizeX, degrees, corridors, carries):
+    """ :return: the count of straight cells of the block """
+    north, west, east, south = (int(b"".join(side), 2) for side in zip(*block))
+    sumNW, carryNW = north ^ west, north & west                                                          # 1
+    sumES, carryES = east ^ south, east & south
+    bit0, carry0 = sumNW ^ sumES, sumNW & sumES
+    bit1, bit2 = carryNW ^ carryES ^ carry0, (carryNW & carryES) | (carry0 & (carryNW ^ carryES))
+    cellCount = len(block) * sizeX
+    degrees[0] += cellCount - (bit0 | bit1 | bit2).bit_count()
+    degrees[1] += (bit0 & ~bit1 & ~bit2).bit_count()
+    degrees[2] += (bit1 & ~bit0 & ~bit2).bit_count()
+    degrees[3] += (bit0 & bit1).bit_count()
+    degrees[4] += bit2.bit_count()
+    _countRuns(east, corridors)                  # 3 (the east-link of the last cell of a row is always a wall)
+
+    southLinks, blockRows = b"".join(links[3] for links in block), len(block)                            # 4
+    _countRuns(int(b"0".join(southLinks[x::sizeX] for x in range(sizeX)), 2), corridors)
+    lastLinks = block[-1][3]
+    for x in range(sizeX):                       # only the columns with a corridor crossing the block-border
+        carry = carries[x]
+        if not carry and lastLinks[x] == 48:     # 48: "0"
+            continue
+        column = southLinks[x::sizeX]
+        if column[0] == 49 and carry:            # the first run continues the corridor of the blocks above
+            leadingLinks = blockRows - len(column.lstrip(b"1"))
+            corridors[leadingLinks] -= 1
+            if leadingLinks == blockRows:
+                carries[x] = carry + blockRows
+                continue
+            corridors[carry + leadingLinks] += 1
+        elif carry:
+            corridors[carry] += 1
+        carries[x] = 0
+        if column[-1] == 49:                     # the last run continues in the next block
+            trailingLinks = blockRows - len(column.rstrip(b"1"))
+            corridors[trailingLinks] -= 1
+            carries[x] = trailingLinks
+    return ((north & south & ~west & ~east) | (west & east & ~north & ~south)).bit_count()              # 2
+
+def _countRuns(links, corridors):
+    """ Counts the runs of 1-bits of the integer links by their lengths, bit-parallel for all runs at once.
+
+    The windows of n links are the bits starting n 1-bits: windows(n + 1) = windows(n) & (links >> n). Every run of
+    at least n links leaves one group of adjacent bits in windows(n), so the count of groups (their lowest bits) is
+    the count of runs of at least n links. The rare runs of LONG_RUN or more links are measured one by one.
+    """
+    windows, length = links, 1
+    atLeast = (windows & ~(windows << 1)).bit_count()
+    while atLeast and length < LONG_RUN:
+        windows &= links >> length
+        longer = (windows & ~(windows << 1)).bit_count()
+        corridors[length] += atLeast - longer
+        atLeast, length = longer, length + 1
+    while windows:
+        start = (windows & -windows).bit_length() - 1
+        run = links >> start
+        runLength = (~run & (run + 1)).bit_length() - 1       # the count of trailing 1-bits
+        corridors[runLength] += 1
+        windows = windows >> (start + runLength) << (start + runLength)
+
+def analyzeMaze(maze, solutionLength=None):
+    """ :return: the statistics of a Maze (see getMazeStats) """
+    return getMazeStats(getMazeRows(maze), maze.sizeX - 1, maze.sizeY - 1, solutionLength)
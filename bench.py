@@ -0,0 +1,140 @@
+import json
+import math
+import platform
+import statistics
+import sys
+import time
+import tracemalloc
+from model import Maze, Spanning3
+from algo import Generator, RootedTree, Pathfinder
+
+DEFAULT_SIZES = ((10, 10), (100, 100), (1000, 1000), (4000, 4000))
+
+
+def _newGenerator(sizeX, sizeY, algorithm, seed):
+    maze = Maze(sizeX, sizeY, seed=seed)
+    return Generator(maze, algorithm)
+
+def _getStages(sizeX, sizeY, algorithm, seed):
+    """ Returns per stage a (setup, run)-pair: setup builds the input of the stage untimed, run is the timed part.
+
+    Every stage works on the same seeded maze, so the numbers of two runs are comparable.
+    """
+    generator = _newGenerator(sizeX, sizeY, algorithm, seed)
+    maze, spanning3 = generator.maze, generator.getSpanning3()
+    start, target = maze.getNode(0, 0), maze.getNode(sizeX-1, sizeY-1)
+
+    def resetRows():
+        if maze.cells is None:
+            maze.setCells()
+        maze._rows = [None] * len(maze.cells)    # dirties every row, so repr joins all of them again
+        return maze
+
+    return {
+        "generate":   (lambda: (sizeX, sizeY, algorithm, seed), lambda args: _newGenerator(*args)),
+        "spanning3":  (lambda: maze, Spanning3.fromWalls),
+        "setCells":   (lambda: maze, Maze.setCells),
+        "repr":       (resetRows, repr),
+        "pathfinder": (lambda: spanning3, lambda tree: Pathfinder(RootedTree(tree, start), start, target)),
+    }
+
+def getPercentile(sortedValues, percent):
+    """ :return: the nearest-rank percentile of the ascending sorted values """
+    return sortedValues[max(0, math.ceil(percent / 100 * len(sortedValues)) - 1)]
+
+def measure(setup, run, repeats=5, warmup=1, isMemoryTraced=True):
+    """ Times a stage repeats times after warmup untimed runs and traces its peak memory in one extra run.
+
+    The memory is traced in a separate run, because tracemalloc slows down every allocation and would distort the
+    timings.
+
+    :return: a dict with the median and p95 latency in nanoseconds and the peak memory in bytes (None if not traced)
+    """
+    for _ in range(warmup):
+        run(setup())
+    durations = []
+    for _ in range(repeats):
+        args = setup()
+        startTime = time.perf_counter_ns()
+        run(args)
+        durations.append(time.perf_counter_ns() - startTime)
+    durations.sort()
+    peakBytes = None
+    if isMemoryTraced:
+        args = setup()
+        tracemalloc.start()
+        run(args)
+        peakBytes = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+    return {"medianNs": int(statistics.median(durations)), "p95Ns": getPercentile(durations, 95), "repeats": repeats,
+            "peakBytes": peakBytes}
+
+def runBenchmarks(sizes=DEFAULT_SIZES, repeats=5, warmup=1, algorithm="dfs", seed=0, isMemoryTraced=True,
+                  progress=sys.stderr):
+    """ Sweeps the sizes and measures every stage of a maze's life: generation, spanning3, rendering and solving.
+
+    :param sizes: an iterable of (sizeX, sizeY)-tuples
+    :param progress: the output of a line per measured stage, None for silence
+    :return: the report as a JSON-serializable dict, the results are keyed by "WIDTHxHEIGHT" and the stage
+    """
+    if any(sizeX * sizeY < 2 for sizeX, sizeY in sizes):
+        raise ValueError("every size needs at least 2 cells, the pathfinder needs a start and a distinct target")
+    results = {}
+    for sizeX, sizeY in sizes:
+        cellCount, key = sizeX * sizeY, "{}x{}".format(sizeX, sizeY)
+        results[key] = {}
+        for stage, (setup, run) in _getStages(sizeX, sizeY, algorithm, seed).items():
+            result = measure(setup, run, repeats, warmup, isMemoryTraced)
+            result["cellsPerSec"] = cellCount * 1e9 / max(result["medianNs"], 1)
+            results[key][stage] = result
+            if progress is not None:
+                progress.write(" {:>11} {:<10} median {:>12.3f} ms  p95 {:>12.3f} ms  {:>14,.0f} cells/sec{}\n"
+                               .format(key, stage, result["medianNs"] / 1e6, result["p95Ns"] / 1e6,
+                                       result["cellsPerSec"], "" if result["peakBytes"] is None
+                                       else "  peak {:,.1f} KiB".format(result["peakBytes"] / 1024)))
+                progress.flush()
+    return {"python": platform.python_version(), "implementation": platform.python_implementation(),
+            "machine": platform.machine(), "algorithm": algorithm, "seed": seed, "warmup": warmup,
+            "results": results}
+
+def compareBaseline(report, baseline, tolerance=0.1):
+    """ Compares the median latencies of a report with a stored baseline report.
+
+    Only stages measured in both reports are compared, so a baseline of other sizes doesn't fail the comparison.
+
+    :param tolerance: the allowed slowdown, 0.1 flags every stage more than 10% slower than the baseline
+    :return: a list of (size, stage, baselineMedianNs, medianNs)-tuples of every regression
+    """
+    regressions = []
+    for size, stages in report["results"].items():
+        for stage, result in stages.items():
+            baselineResult = baseline.get("results", {}).get(size, {}).get(stage)
+            if baselineResult is not None and result["medianNs"] > baselineResult["medianNs"] * (1 + tolerance):
+                regressions.append((size, stage, baselineResult["medianNs"], result["medianNs"]))
+    return regressions
+
+def runBench(sizes=DEFAULT_SIZES, repeats=5, warmup=1, algorithm="dfs", seed=0, outPath=None, baselinePath=None,
+             tolerance=0.1, isMemoryTraced=True, progress=sys.stderr):
+    """ Runs the benchmarks, writes the report as JSON and flags the regressions against the baseline.
+
+    :param outPath: the file the JSON-report is written to, stdout if None
+    :param baselinePath: the JSON-report of an earlier run to compare with, no comparison if None
+    :return: the list of regressions (see compareBaseline), empty without baseline
+    """
+    report = runBenchmarks(sizes, repeats, warmup, algorithm, seed, isMemoryTraced, progress)
+    if outPath is None:
+        json.dump(report, sys.stdout, indent=2)
+        sys.stdout.write("\n")
+    else:
+        with open(outPath, "w", encoding="utf-8") as file:
+            json.dump(report, file, indent=2)
+    if baselinePath is None:
+        return []
+    with open(baselinePath, encoding="utf-8") as file:
+        regressions = compareBaseline(report, json.load(file), tolerance)
+    for size, stage, baselineNs, medianNs in regressions:
+        progress.write(" REGRESSION {} {}: {:.3f} ms -> {:.3f} ms ({:+.1f}%)\n".format(
+            size, stage, baselineNs / 1e6, medianNs / 1e6, (medianNs / baselineNs - 1) * 100))
+    if not regressions:
+        progress.write(" No regressions against {} (tolerance {:.0f}%)\n".format(baselinePath, tolerance * 100))
+    return regressions
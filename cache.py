@@ -0,0 +1,76 @@
+import sys
+from collections import OrderedDict
+from model import Maze
+from algo import Generator
+
+
+class MazeCache:
+    def __init__(self, memoryBudget=256 * 1024 * 1024, isRenderingCells=True):
+        """ Least recently used (LRU) cache of generated mazes, keyed by (sizeX, sizeY, algorithm, seed, braid).
+
+        As a maze is reproducible by its seed, a repeated request is served from the cache without regenerating it. An
+        entry holds the Generator with the maze (its walls and rendered cells), the spanning3 and its LCAIndex. The
+        least recently used entries are evicted as soon as the estimated size of all entries exceeds the memory budget.
+
+        :param memoryBudget: the maximum estimated size of all cached entries in bytes
+        :param isRenderingCells: renders the cells of every maze (Maze.setCells), False for users of Maze.renderWindow
+        """
+        self.memoryBudget, self.memoryUsed, self.isRenderingCells = memoryBudget, 0, isRenderingCells
+        self.hits, self.misses = 0, 0
+        self._entries = OrderedDict()            # key → (generator, estimated size)
+
+    def get(self, sizeX, sizeY, algorithm="dfs", seed=0, braid=None) -> Generator:
+        """ :param braid: the loopRatio of Generator.braid, a perfect maze if None
+            :return: the Generator of the maze (see Generator.maze), generated and rendered once per key """
+        key = (sizeX, sizeY, algorithm, seed, braid)
+        if key in self._entries:
+            self.hits += 1
+            self._entries.move_to_end(key)
+            return self._entries[key][0]
+        return self.put(key, self.build(*key))
+
+    def build(self, sizeX, sizeY, algorithm="dfs", seed=0, braid=None) -> Generator:
+        """ Generates the maze of a key without touching the cache, so it may run in another thread (see put).
+
+        :return: the Generator with the LCAIndex built and the cells rendered (if isRenderingCells)
+        """
+        generator = Generator(Maze(sizeX, sizeY, seed=seed), algorithm)
+        if braid is not None:
+            generator.braid(braid)
+        generator.getLCAIndex()
+        if self.isRenderingCells:
+            generator.maze.setCells()
+        return generator
+
+    def put(self, key, generator) -> Generator:
+        """ Adds the Generator built for the key (see build) and evicts the least recently used entries over budget.
+
+        :return: the generator
+        """
+        self.misses += 1
+        size = getEstimatedSize(generator)
+        self._entries[key] = (generator, size)
+        self.memoryUsed += size
+        while self.memoryUsed > self.memoryBudget and len(self._entries) > 1:
+            evictedGenerator, evictedSize = self._entries.popitem(last=False)[1]
+            self.memoryUsed -= evictedSize
+        return generator
+
+    def __contains__(self, key):
+        return key in self._entries
+
+    def __len__(self):
+        return len(self._entries)
+
+
+def getEstimatedSize(generator:Generator) -> int:
+    """ Estimates the memory of a cached maze: its walls, spanning3, LCAIndex and the rendered cells with their rows. """
+    maze, spanning3 = generator.maze, generator.getSpanning3()
+    size = len(maze.walls) + len(spanning3.links) + spanning3.offsets.nbytes + spanning3.neighbors.nbytes
+    index = generator.getLCAIndex()
+    for indexArray in (index.parents, index.depths, index.order, index.heads):
+        size += indexArray.itemsize * len(indexArray)
+    if maze.cells is not None:
+        # 2 strings of 4 characters per cell (plus the list-pointer) and the joined text-rows with 2 bytes per character
+        size += len(maze.cells) * maze.sizeX * (sys.getsizeof("┃   ") + 8 + 4 * 2)
+    return size
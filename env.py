@@ -0,0 +1,112 @@
+import itertools
+from array import array
+from operator import add, eq
+from model import Maze, Player
+from algo import Generator
+from metrics import METRICS, timed
+
+RIGHT, DOWN, LEFT, UP = 0, 1, 2, 3           # the actions: the directions of the spanning3 (link-bit 1 << action)
+# every game is stepped by a step-key byte: the link-bits of its cell (bits 0-3), its action (bits 4-5, bit 6 for an
+# invalid action) and its done-flag (bit 7), so a step is decided by looking up the key in 256-entry tables
+ACTION_BITS = bytes(action << 4 if action < 4 else 0x40 for action in range(256))
+DONE_BITS = bytes((0, 0x80)) + bytes(254)
+REWARDS = bytes(0 if key & 0x80 else 0xFF for key in range(256))   # -1 (as signed byte) per ply, 0 once done
+
+
+def _getStepTable(sizeX):
+    """ :return: the step-key to the cell-id-offset of the move: 0 for a wall, an invalid action or a done game """
+    steps = (1, sizeX, -1, -sizeX)
+    return tuple(0 if key & 0xC0 or not key >> (key >> 4 & 3) & 1 else steps[key >> 4 & 3] for key in range(256))
+
+
+class MazeEnv:
+    def __init__(self, count, sizeX, sizeY, algorithm="dfs", braid=None, length=None):
+        """ Headless environment running count games of maze-solving bots in lockstep, without input or printing.
+
+        The links of the spanning3 of every game's maze are stacked into one bytearray (maze i at the offset
+        i * self.cellCount, like MazeBatch) and the players are cell-ids into it, so a step of all games is a handful
+        of operations over whole byte-strings running in C (map, bytes.translate and an OR of big integers) instead of
+        a Python loop per game.
+
+        An action is a direction of the spanning3 (RIGHT, DOWN, LEFT, UP). A step costs -1 reward per game like a ply
+        of MazeGame.play, a wall or an invalid action leaves the player in place, so the return of an episode is
+        -plyCounter. A game reaching its target is done and stays in place with reward 0 until it's reset.
+
+        :param count: the count of games
+        :param sizeX: cell count of the x-axis of every maze (like Maze)
+        :param sizeY: cell count of the y-axis of every maze
+        :param algorithm: the generation algorithm, one of Generator.ALGORITHMS
+        :param braid: the loopRatio of Generator.braid, a perfect maze if None
+        :param length: the solution-path-length between start and target (see Generator.getEndpoints), random
+         endpoints (like MazeGame) if None
+        """
+        if algorithm not in Generator.ALGORITHMS:
+            raise ValueError("unknown algorithm '{}', choose one of {}".format(algorithm,
+                                                                              ", ".join(Generator.ALGORITHMS)))
+        self.count, self.algorithm, self.braid, self.length = count, algorithm, braid, length
+        self.sizeX, self.sizeY = sizeX+1, sizeY+1
+        self.cellCount = self.sizeX * self.sizeY
+        self.links = bytearray(count * self.cellCount)
+        self.positions, self.targets = [0] * count, [0] * count     # cell-ids into the stacked links
+        self.observations, self.dones = bytes(count), bytes([1]) * count   # done until reset
+        self._steps = _getStepTable(self.sizeX)
+
+    @timed("env.reset")
+    def reset(self, seeds=None, indices=None):
+        """ Generates a new maze with start and target for the games at indices.
+
+        :param seeds: an iterable of the maze-seeds of the reset games (reproducible like Maze), random seeds if None
+        :param indices: an iterable of the indices of the games to reset, i.e. the done ones, all games if None
+        :return: the observations of all games (see step)
+        """
+        indices = range(self.count) if indices is None else indices
+        dones = bytearray(self.dones)
+        for index, seed in zip(indices, itertools.repeat(None) if seeds is None else seeds):
+            maze = Maze(self.sizeX-1, self.sizeY-1, seed=seed)
+            generator = Generator(maze, self.algorithm)
+            if self.braid is not None:
+                generator.braid(self.braid)
+            if self.length is None:
+                player = Player(maze.sizeX-1, maze.sizeY-1, maze.rng)
+                startId, targetId = maze.getId(*player.getPos()), maze.getId(*player.getTarget())
+            else:
+                startId, targetId = generator.getEndpoints(self.length)
+            offset = index * self.cellCount
+            self.links[offset:offset + self.cellCount] = generator.getSpanning3().links
+            self.positions[index], self.targets[index], dones[index] = offset + startId, offset + targetId, 0
+        self.dones = bytes(dones)
+        self.observations = bytes(map(self.links.__getitem__, self.positions))
+        return self.observations
+
+    @timed("env.step")
+    def step(self, actions):
+        """ Advances every game by its action at once.
+
+     |  1  COMBINE the link-bits of every game's cell (its observation), its action and its done-flag to its step-key:
+     |     the three byte-strings are OR-ed as big integers, their bits don't overlap, so it's an OR per byte
+     |  2  MOVE every player by the cell-id-offset of its step-key, a wall or a done game adds 0
+     |  3  OBSERVE the link-bits of the new cells, REWARD by the step-keys and mark the games on their target DONE
+
+        :param actions: a bytes-like object or iterable with the action (RIGHT, DOWN, LEFT, UP) of every game
+        :return: a tuple of observations, rewards and dones: the link-bits (1 << action for an open side) of every
+         game's cell as bytes, the rewards as array('b') and the done-flags (1 for done) as bytes
+        """
+        actions, count = bytes(actions), self.count
+        if len(actions) != count:
+            raise ValueError("{} actions for {} games".format(len(actions), count))
+        keys = (int.from_bytes(self.observations, "little") | int.from_bytes(actions.translate(ACTION_BITS), "little")
+                | int.from_bytes(self.dones.translate(DONE_BITS), "little")).to_bytes(count, "little")            # 1
+        self.positions = list(map(add, self.positions, map(self._steps.__getitem__, keys)))                      # 2
+        self.observations = bytes(map(self.links.__getitem__, self.positions))                                   # 3
+        rewards = array('b')
+        rewards.frombytes(keys.translate(REWARDS))
+        self.dones = bytes(map(eq, self.positions, self.targets))
+        METRICS.increment("env.steps", count)
+        return self.observations, rewards, self.dones
+
+    def getCellIds(self) -> list:
+        """ :return: the cell-id (Maze.getId) of every player within its maze """
+        return [position % self.cellCount for position in self.positions]
+
+    def getTargetIds(self) -> list:
+        return [target % self.cellCount for target in self.targets]
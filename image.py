@@ -0,0 +1,135 @@
+import struct
+import zlib
+from model import NORTH, WEST, getMazeRows
+
+# every cell is drawn as 2x2 units (corner, north-wall / west-wall, floor) plus one unit for the east and south wall,
+# a unit is one palette-index: the same value is the colour-index of the PNG-palette
+WALL, FLOOR, PATH = 0, 1, 2
+PALETTE = bytes((0, 0, 0, 255, 255, 255, 220, 30, 30))             # black walls, white floor, red solution-path
+NORTH_UNITS = bytes(WALL if cellWalls & NORTH else FLOOR for cellWalls in range(256))
+WEST_UNITS = bytes(WALL if cellWalls & WEST else FLOOR for cellWalls in range(256))
+# units to the ASCII-digits of the packed pixels: PBM is 1 for black, PNG uses the palette-index (see _packLine)
+PBM_DIGITS = bytes.maketrans(bytes((WALL, FLOOR, PATH)), b"100")
+PNG_DIGITS = bytes.maketrans(bytes((WALL, FLOOR, PATH)), b"012")
+PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+IDAT_SIZE = 1 << 16                          # compressed bytes collected before an IDAT-chunk is written
+
+
+def _getUnitLines(rows, sizeX, pathCells):
+    """ Converts the rows of walls to lines of units, two lines per row of cells and one for the south boundary.
+
+ |  1  WALL LINE: corner, north-wall of every cell and the corner of the east boundary
+ |  2  FLOOR LINE: west-wall and floor of every cell and the east wall
+ |  3  PAINT the cells of the solution-path and the gaps between two linked cells of the path
+
+    :param rows: an iterable of bytearrays with the NORTH- and WEST-bits of sizeX cells and the east boundary cell, the
+     last row is the south boundary
+    :param pathCells: a dict of y-coordinate to the set of x-coordinates of the cells on the solution-path
+    """
+    width = 2 * sizeX + 1
+    for y, row in enumerate(rows):
+        wallLine = bytearray(width)                                      # 1 (corners are always walls in a perfect maze)
+        wallLine[1::2] = row[:sizeX].translate(NORTH_UNITS)
+        floorLine = bytearray([FLOOR]) * width                           # 2
+        floorLine[0::2] = row[:sizeX + 1].translate(WEST_UNITS)
+        for x in pathCells.get(y, ()):                                   # 3
+            floorLine[2 * x + 1] = PATH
+            if x in pathCells.get(y - 1, ()) and not row[x] & NORTH:
+                wallLine[2 * x + 1] = PATH
+            if x - 1 in pathCells[y] and not row[x] & WEST:
+                floorLine[2 * x] = PATH
+        yield wallLine
+        yield floorLine
+
+def _getScanlines(rows, sizeX, sizeY, scale, path):
+    """ Yields the unit-lines of the image scaled by scale in both directions, the last row only yields its wall line.
+
+    :param path: an iterable of the cell-ids (with the sizeX + 1 cells per row of Maze.getId) of the solution-path
+    """
+    pathCells = {}
+    for cellId in path or ():
+        pathCells.setdefault(cellId // (sizeX + 1), set()).add(cellId % (sizeX + 1))
+    lineCount = 2 * sizeY + 1
+    for index, line in enumerate(_getUnitLines(rows, sizeX, pathCells)):
+        if index == lineCount:                   # the floor line of the south boundary isn't part of the image
+            break
+        if scale > 1:
+            scaledLine = bytearray(len(line) * scale)
+            for offset in range(scale):
+                scaledLine[offset::scale] = line
+            line = scaledLine
+        for _ in range(scale):
+            yield line
+
+def _packLine(line, digits, bitDepth):
+    """ Packs a line of units into bytes with bitDepth bits per pixel (the first pixel in the highest bits).
+
+    The units are translated to ASCII-digits and parsed as one big number, so the packing runs in C and not pixel by
+    pixel in Python. The line is padded to whole bytes.
+    """
+    pixelsPerByte = 8 // bitDepth
+    padding = -len(line) % pixelsPerByte
+    text = line.translate(digits) + b"0" * padding
+    return int(text, 1 << bitDepth).to_bytes((len(line) + padding) // pixelsPerByte, "big")
+
+def writePbm(rows, sizeX, sizeY, file, scale=1):
+    """ Writes the maze as binary PBM-image (1 bit per pixel) scanline by scanline, so it needs O(sizeX) memory.
+
+    :param rows: the rows of the maze (see EllerGenerator.getRows or getMazeRows)
+    :param sizeX: cell count of the x-axis without the boundary (like EllerGenerator)
+    :param sizeY: cell count of the y-axis without the boundary
+    :param file: a file opened for writing bytes
+    :param scale: the pixel count of a unit in both directions
+    """
+    width, height = (2 * sizeX + 1) * scale, (2 * sizeY + 1) * scale
+    file.write(b"P4\n%d %d\n" % (width, height))
+    for line in _getScanlines(rows, sizeX, sizeY, scale, None):
+        file.write(_packLine(line, PBM_DIGITS, 1))
+
+def writePng(rows, sizeX, sizeY, file, scale=1, path=None):
+    """ Writes the maze as palette-PNG-image scanline by scanline, compressed with zlib, so it needs O(sizeX) memory.
+
+    Without a path the image has 1 bit per pixel (black and white), with a path 2 bits per pixel for the red
+    solution-path.
+
+    :param path: an iterable of cell-ids (Maze.getId) painted as solution-path, i.e. of Pathfinder.getSolutionPath
+     with the start- and target-cell
+    (for the other parameters see writePbm)
+    """
+    width, height = (2 * sizeX + 1) * scale, (2 * sizeY + 1) * scale
+    bitDepth = 1 if path is None else 2
+    file.write(PNG_SIGNATURE)
+    _writeChunk(file, b"IHDR", struct.pack(">IIBBBBB", width, height, bitDepth, 3, 0, 0, 0))
+    _writeChunk(file, b"PLTE", PALETTE if bitDepth == 2 else PALETTE[:6])
+    compressor, compressed = zlib.compressobj(6), []
+    compressedSize = 0
+    for line in _getScanlines(rows, sizeX, sizeY, scale, path):
+        data = compressor.compress(b"\x00" + _packLine(line, PNG_DIGITS, bitDepth))    # filter-type 0: None
+        if data:
+            compressed.append(data)
+            compressedSize += len(data)
+        if compressedSize >= IDAT_SIZE:
+            _writeChunk(file, b"IDAT", b"".join(compressed))
+            compressed, compressedSize = [], 0
+    compressed.append(compressor.flush())
+    _writeChunk(file, b"IDAT", b"".join(compressed))
+    _writeChunk(file, b"IEND", b"")
+
+def _writeChunk(file, chunkType, data):
+    file.write(struct.pack(">I", len(data)))
+    file.write(chunkType)
+    file.write(data)
+    file.write(struct.pack(">I", zlib.crc32(data, zlib.crc32(chunkType))))
+
+def exportImage(maze, path, scale=1, solutionPath=None):
+    """ Writes the maze to an image-file, a PBM-image if the path ends with .pbm, else a PNG-image.
+
+    :param solutionPath: an iterable of cell-ids painted as solution-path (PNG only)
+    """
+    with open(path, "wb") as file:
+        if path.lower().endswith(".pbm"):
+            if solutionPath is not None:
+                raise ValueError("a PBM-image has only black and white, export the solution-path as PNG")
+            writePbm(getMazeRows(maze), maze.sizeX - 1, maze.sizeY - 1, file, scale)
+        else:
+            writePng(getMazeRows(maze), maze.sizeX - 1, maze.sizeY - 1, file, scale, solutionPath)
@@ -1,16 +1,38 @@
-import time
+import sys
+import json
+import random
 import argparse
 
-from model import Maze, Player
-from algo import Generator, Pathfinder
+from model import Maze, Player, writeRows
+from algo import Generator, Pathfinder, EllerGenerator, IncrementalPath, FieldPath
+from terminal import AnsiTerminal
+from batch import runBatch
+from server import runServer
+from bench import runBench, DEFAULT_SIZES
+from metrics import METRICS, PROFILE_MODES, Profiling, span, timed
+from image import exportImage, writePbm, writePng
+from analysis import analyzeMaze
+from session import Session, Replayer, appendSession
 
 
 class MazeGame:
-    def __init__(self):
+    def __init__(self, viewport=None, isAnsi=False, algorithm="dfs", seed=None, length=None,
+                 braid=None, recordPath=None):
+        """ :param viewport: (width, height) of the window of cells printed around the player, None prints the whole
+         maze
+            :param isAnsi: redraws only the changed cells with ANSI escape codes while playing (without viewport)
+            :param algorithm: the generation algorithm of the mazes, one of Generator.ALGORITHMS
+            :param seed: the seed of the sequence of mazes (and players), a random sequence if None
+            :param length: the solution-path-length between the player's start and end, 0 for the hardest pair of
+         cells, random endpoints if None
+            :param braid: the share of dead-ends opened to loops (see Generator.braid), a perfect maze if None
+            :param recordPath: the session-log every game is appended to (see Session), no recording if None """
         self.maze, self.generator, self.mazeSpanningTree, self.player, self.pathfinder, self.solutionSize, \
             self.canPlay = None, None, None, None, None, None, None
-        self.mazeDurTime, self.buildMazeCellsDurTime, self.solutionDurTime, self.printDurTime, self.markDurTime \
-            = None, None, None, None, None
+        self.viewport, self.isSolutionMarked, self.isAnsi, self.terminal = viewport, False, isAnsi, None
+        self.solutionPath = None
+        self.algorithm, self.seeds, self.length, self.distanceField = algorithm, random.Random(seed), length, None
+        self.braid, self.recordPath = braid, recordPath
 
     def run(self, x=-1, y=-1, argsMsg=""):
         isRunning = True
@@ -29,14 +51,12 @@ class MazeGame:
                         self.generateAndPrintMaze(x,y)
                     case '1':
                         if self.canPlay:
-                            self.printMaze(True)
                             self.play()
                         else:
                             print(ERROR_CANT_PLAY)
                     case '2':
-                        startTime = time.time_ns()
-                        self.markSolutionPath(True)
-                        self.markDurTime = time.time_ns() - startTime
+                        with span("game.mark"):
+                            self.markSolutionPath(True)
                         print(" The solution-path is {} cells long:".format(self.solutionSize))
                         self.printMaze(True)
                         self.printSolutionDurationStats()
@@ -56,6 +76,8 @@ class MazeGame:
                         self.printMazeSetPathfinder()
                     case '7':
                         print(INFO)
+                    case '8':
+                        self.exportMazeImage(input("Image file (.png or .pbm): ").strip() or "maze.png")
                     case '9' | 'q':
                         isRunning = False
                         print(" Exiting Maze-Game")
@@ -88,16 +110,18 @@ class MazeGame:
         return self.maze
 
     def setMaze(self, x, y):
-        startTime = time.time_ns()
-        self.maze = Maze(x, y)
-        self.generator = Generator(self.maze)
-        self.mazeDurTime = time.time_ns() - startTime
+        with span("game.maze"):
+            self.maze = Maze(x, y, seed=self.seeds.getrandbits(63))
+            self.generator = Generator(self.maze, self.algorithm)
+            if self.braid is not None:
+                self.generator.braid(self.braid)
 
         self.mazeSpanningTree = self.generator.getSpanning3()
 
-        startTime = time.time_ns()
-        self.maze.setCells()                 # generates the maze-output for the console, which is stored in a 2D-array
-        self.buildMazeCellsDurTime = time.time_ns() - startTime
+        with span("game.cells"):
+            if self.viewport is None:        # a viewport builds only the cells within its window on every print
+                self.maze.setCells()         # generates the maze-output for the console, which is stored in a 2D-array
+        self.terminal = AnsiTerminal(self.maze) if self.isAnsi and self.viewport is None else None
 
     def getPlayer(self):
         return self.player
@@ -106,9 +130,13 @@ class MazeGame:
         if self.player is not None:
             self.maze.setMarker(self.player.getPosX(), self.player.getPosY(), "   ")
             self.maze.setMarker(self.player.getTargetX(), self.player.getTargetY(), "   ")
-            self.player.setPosTarget(self.maze.sizeX-1, self.maze.sizeY-1)
+            self.player.setPosTarget(self.maze.sizeX-2, self.maze.sizeY-2)   # the last inner cell, like Player
         else:
-            self.player = Player(self.maze.sizeX-1, self.maze.sizeY-1)
+            self.player = Player(self.maze.sizeX-1, self.maze.sizeY-1, self.maze.rng)
+        if self.length is not None:
+            startId, targetId = self.generator.getEndpoints(self.length)
+            self.player.setPos(startId % self.maze.sizeX, startId // self.maze.sizeX)
+            self.player.setTarget(targetId % self.maze.sizeX, targetId // self.maze.sizeX)
 
         self.maze.setMarker(self.player.getPosX(), self.player.getPosY(), "PLY")
         self.maze.setMarker(self.player.getTargetX(), self.player.getTargetY(), "END")
@@ -126,22 +154,62 @@ class MazeGame:
     def getPathfinder(self):
         return self.pathfinder
 
+    @timed("game.solution")
     def setPathfinder(self):
-        startTime = time.time_ns()
-        self.pathfinder = Pathfinder(self.generator.getSpanning3(),
+        if not self.generator.isPerfect:     # a braided maze has many paths, the shortest one is followed
+            self.pathfinder = None
+            self.distanceField = self.generator.getDistanceField(self.player.getTargetX(), self.player.getTargetY())
+            self.solutionPath = FieldPath(self.distanceField,
+                                          self.maze.getId(self.player.getPosX(), self.player.getPosY()))
+            return
+        self.pathfinder = Pathfinder(self.generator.getLCAIndex(),
                                      self.maze.getNode(self.player.getPosX(), self.player.getPosY()),
                                      self.maze.getNode(self.player.getTargetX(), self.player.getTargetY()))
-        self.solutionDurTime = time.time_ns() - startTime
+        # the solutionPath is kept up to date by every move of the player, so it's solved only once per game
+        self.solutionPath = IncrementalPath([self.maze.getId(self.player.getPosX(), self.player.getPosY())]
+                                            + [node.getId() for node in self.pathfinder.getSolutionPath()]
+                                            + [self.maze.getId(self.player.getTargetX(), self.player.getTargetY())])
 
     def markSolutionPath(self, isMarked):
         marker = " ■ " if isMarked else "   "
-        for node in self.pathfinder.getSolutionPath():
-            self.maze.setMarker(node.getX(), node.getY(), marker)
+        for cellId in self.solutionPath.getSolutionPath():
+            self.maze.setMarker(cellId % self.maze.sizeX, cellId // self.maze.sizeX, marker)
+        self.isSolutionMarked = isMarked
 
+    @timed("game.print")
     def printMaze(self, isPrintMaze):
-        startTime = time.time_ns()
-        print(self.maze if isPrintMaze else self.maze.printOutAsArray())
-        self.printDurTime = time.time_ns() - startTime
+        if isPrintMaze and self.viewport is not None:
+            print(self.maze.renderWindow(*self.getViewportWindow()))
+        elif isPrintMaze:
+            self.maze.writeTo(sys.stdout)
+        else:
+            print(self.maze.printOutAsArray())
+
+    def printMazeChanges(self, isRedraw=False):
+        """ Prints the maze while playing, with the ANSI-terminal only the changed cells are redrawn. """
+        if self.terminal is None:
+            self.printMaze(True)
+            return
+        with span("game.print"):
+            if isRedraw:
+                self.terminal.draw()
+            else:
+                self.terminal.update()
+
+    def getViewportWindow(self):
+        """ Centers the viewport on the player or, while the solution-path is marked, on the solution-path with both
+        of its ends, so as much of the solution as fits into the viewport is shown. """
+        width, height = self.viewport
+        if self.isSolutionMarked:
+            columns = [self.player.getPosX(), self.player.getTargetX()]
+            rows = [self.player.getPosY(), self.player.getTargetY()]
+            for cellId in self.solutionPath.getSolutionPath():
+                columns.append(cellId % self.maze.sizeX)
+                rows.append(cellId // self.maze.sizeX)
+            centerX, centerY = (min(columns) + max(columns)) // 2, (min(rows) + max(rows)) // 2
+        else:
+            centerX, centerY = self.player.getPosX(), self.player.getPosY()
+        return self.maze.getWindow(centerX, centerY, width, height)
 
     def printMazeSetPathfinder(self):
         print("\nPlayer start-coordinate at x={},y={} and end-coordinate at x={},y={}:"
@@ -150,26 +218,45 @@ class MazeGame:
         self.printMaze(True)
         self.setPathfinder()
         # solutionSize as comparison for player's game performance, canPlay: player allowed to play the maze-game
-        self.solutionSize, self.canPlay = len(self.pathfinder.getSolutionPath()) + 1, True
+        self.distanceField = self.generator.getDistanceField(self.player.getTargetX(), self.player.getTargetY())
+        self.solutionSize, self.canPlay = self.distanceField.getDistance(
+            self.maze.getId(self.player.getPosX(), self.player.getPosY())), True
         
+    def exportMazeImage(self, path, scale=4):
+        """ Writes the maze to a PNG-image with the solution-path from the player's position or to a PBM-image. """
+        solutionPath = None
+        if not path.lower().endswith(".pbm"):
+            solutionPath = [self.maze.getId(self.player.getPosX(), self.player.getPosY())] \
+                           + self.solutionPath.getSolutionPath() \
+                           + [self.maze.getId(self.player.getTargetX(), self.player.getTargetY())]
+        with span("game.export"):
+            exportImage(self.maze, path, scale, solutionPath)
+        print(" The maze was exported to {} in {}.\n".format(path, getDurTimeUnit(METRICS.getLast("game.export"))))
+
     def printMazeDurationStats(self):
         print(" It took {} to generate this maze,\n\t\t{} to build the Maze-Output-Array\n\t and {} to print it out.\n"
-              .format(getDurTimeUnit(self.mazeDurTime), getDurTimeUnit(self.buildMazeCellsDurTime),
-                      getDurTimeUnit(self.printDurTime)))
+              .format(getDurTimeUnit(METRICS.getLast("game.maze")), getDurTimeUnit(METRICS.getLast("game.cells")),
+                      getDurTimeUnit(METRICS.getLast("game.print"))))
 
     def printSolutionDurationStats(self):
-        print(" It took {} to find the only Path connecting PLY-Cell at x={}, y={} to END-Cell at x={}, y={} \n" \
+        print(" It took {} to find the {} Path connecting PLY-Cell at x={}, y={} to END-Cell at x={}, y={} \n" \
               "     and {} to mark the Solution-Path in the maze to see it in the maze's printout\n" \
-              "   after {}.\n".format(getDurTimeUnit(self.solutionDurTime), self.player.getPosX() + 1,
+              "   after {}.\n".format(getDurTimeUnit(METRICS.getLast("game.solution")),
+                                      "only" if self.generator.isPerfect else "shortest", self.player.getPosX() + 1,
                                       self.player.getPosY() + 1, self.player.getTargetX() + 1,
-                                      self.player.getTargetY()+1, getDurTimeUnit(self.markDurTime),
-                                      getDurTimeUnit(self.printDurTime)))
+                                      self.player.getTargetY()+1, getDurTimeUnit(METRICS.getLast("game.mark")),
+                                      getDurTimeUnit(METRICS.getLast("game.print"))))
 
     def play(self):
         isPlaying, isShowSolution, plyCounter, direction, marker, msg = True, False, 0, 0, "", ""
         columnModifier =  (0, 0, -1, 0, 1)
         rowModifier    =  (0, -1, 0, 1, 0)
         currentCell = self.maze.getNode(self.player.getPosX(), self.player.getPosY())
+        session = None if self.recordPath is None else Session.fromGame(
+            self.maze, self.braid, currentCell.getId(),
+            self.maze.getId(self.player.getTargetX(), self.player.getTargetY()),
+            self.distanceField.getDistance(currentCell.getId()))
+        self.printMazeChanges(True)
         while isPlaying:
             match(input(GAME_INPUT_MSG)):
                 case '8' | 'w':
@@ -198,31 +285,39 @@ class MazeGame:
                 destinationRow    = self.player.getPosY() + rowModifier[direction]    # y
                 if self.player.isPositionWithinMazeBoundary(destinationColumn, destinationRow):
                     destinationCell = self.maze.getNode(destinationColumn, destinationRow)
-                    # ↓ checks if the list-value of currentCell-key in the dictionary mazeSpanningTree contains the
-                    # ↓ destinationCell, meaning if there is path which connects currentCell to destinationCell. There's
-                    # ↓ no need to check if there is a wall inbetween as the mazeSpanningTree stores only valid paths.
-                    if destinationCell in self.mazeSpanningTree[currentCell] and not isShowSolution:
+                    # ↓ tests the link-bit of the mazeSpanningTree, meaning if there is path which connects currentCell to
+                    # ↓ destinationCell. There's no need to check if there is a wall inbetween as the mazeSpanningTree
+                    # ↓ stores only valid paths.
+                    if self.mazeSpanningTree.isLinked(currentCell.getId(), destinationCell.getId()) \
+                            and not isShowSolution:
                         self.player.setPos(destinationColumn, destinationRow)
+                        METRICS.increment("game.moves")
+                        self.solutionPath.move(currentCell.getId(), destinationCell.getId())
                         self.maze.setMarker(currentCell.getX(), currentCell.getY(), marker)
                         self.maze.setMarker(destinationColumn, destinationRow, "PLY")
                         currentCell = destinationCell
                         msg = ""
+                        if session is not None:  # the directions 1-4 (up, left, down, right) to those of the spanning3
+                            session.recordMove(4 - direction)
                         if self.player.isPosTargetEqual():
                             self.canPlay, isPlaying, difference = False, False, plyCounter - self.solutionSize
                             msg = CONGRATS_MSG.format(plyCounter, ("longer than" if difference >= 1
                                                                     else "the same amount as"),
                                                       (f"of {self.solutionSize} cells!" if difference >= 1  else ""))
                     elif isShowSolution:
-                        self.setPathfinder()         # recalculates the solution path from player's current position.
                         self.markSolutionPath(True)  # might overwrite player's arrow-direction-markers.
-                    elif currentCell == destinationCell:
-                        msg = "\n\tError: Invalid key pressed!\n"
+                        msg = STEPS_REMAINING_MSG.format(self.solutionPath.getStepsRemaining())
                     else:
-                        msg = "\n\tError: Invalid direction → wall\n"
+                        msg = "\n\tError: Invalid key pressed!\n" if currentCell == destinationCell \
+                            else "\n\tError: Invalid direction → wall\n"
+                        if session is not None:
+                            session.recordWastedPly()
                 else:
                     msg = "\n\tError: Invalid direction → out of maze boundary\n"
+                    if session is not None:
+                        session.recordWastedPly()
 
-                self.printMaze(True)
+                self.printMazeChanges()
                 print(msg)
 
                 if isShowSolution:
@@ -230,9 +325,30 @@ class MazeGame:
                     isShowSolution = False
             else:
                 print("\nPlayer ended game!\nTo continue the previous game, choose option [1] below.\n")
+        if session is not None:                  # a finished or ended game is appended to the session-log
+            session.finish(plyCounter, self.player.isPosTargetEqual())
+            appendSession(self.recordPath, session)
 
 
 AXIS_HELP_MSG = "Separate the cell-count-values for x- and y-axis by 1 space.\nI.e.: mazegamy.py 10 10"
+VIEWPORT_HELP_MSG = "print only a window of WIDTHxHEIGHT cells around the player, i.e. 40x20"
+ANSI_HELP_MSG = "redraw only the changed cells with ANSI escape codes while playing (full redraw if not supported)"
+ALGORITHM_HELP_MSG = "maze generation algorithm: dfs (long corridors), kruskal, wilson (uniform), prim or the " \
+                     "fastest sidewinder and binarytree"
+STREAM_HELP_MSG = "stream a maze of X*Y cells row by row to stdout (Eller's algorithm) instead of playing, " \
+                  "i.e. mazegame.py --stream 1000 10000000 > out.txt"
+LENGTH_HELP_MSG = "solution-path-length between the player's start and end or 'max' for the two farthest cells of " \
+                  "the maze (default: random endpoints)"
+BRAID_HELP_MSG = "share of the dead-ends (0 to 1) opened to loops, so the maze has more than one path and the " \
+                 "shortest one is searched (default: a perfect maze)"
+RECORD_HELP_MSG = "append every played game to the session-log PATH, verified by: mazegame.py replay PATH"
+IMAGE_HELP_MSG = "with --stream: write the streamed maze as image to PATH instead of text, a PBM-image if PATH ends " \
+                 "with .pbm, else a PNG-image"
+PROFILE_HELP_MSG = "profile the program with cProfile or the low-overhead sampling profiler, the stats are printed " \
+                   "to stderr at the end (also set by the environment variable MAZE_PROFILE)"
+METRICS_HELP_MSG = "write the latency-histograms and counters to PATH at the end, in the Prometheus text format if " \
+                   "PATH ends with .prom, else as JSON"
+ERROR_STREAM_SIZE = "Error: The values for x and y of a streamed maze must be greater than 0!\n"
 PARAM_MSG = "\nGenerating a maze of {} cells, with {} cells for the x-axis and {} cells for the y-axis.\n"
 ERROR_OVER_2_PARAM = "\nError: Too many arguments!\nExactly 2 integer arguments are allowed.\n"
 ERROR_ONLY_1_PARAM = ERROR_OVER_2_PARAM.replace("many","few")
@@ -248,6 +364,7 @@ MENU = """  [0] Generate a random 'perfect' maze.
   [6] New random Player start and end position.
   
   [7] About Maze-Game 
+  [8] Export the maze as image (PNG with the solution-path or PBM)
   [9] Exit program 
 """
 INFO = "\n{0:>39}\n{1:>29}\n{2:>36}\n{3:>58}\n\n{4}\n{5:>93}\n"\
@@ -256,6 +373,7 @@ INFO = "\n{0:>39}\n{1:>29}\n{2:>36}\n{3:>58}\n\n{4}\n{5:>93}\n"\
              "Maze-Game version 1: https://github.com/Malkogiannidou/MazeGame_MazeSolver_MazeGenerator")
 GAME_INPUT_MSG = "Press one key for intended direction and then enter- or return-key: \n" \
                  "up ↑: w / 8 ┃ down ↓: s / 5 ┃ left ←: a / 4 ┃ right →: d / 6  ┃┃ show solution: 2 ┃ end game: 9 ┃┣ "
+STEPS_REMAINING_MSG = "\n\t{} steps remaining to the target.\n"
 CONGRATS_MSG = "\tCongratulations! You reached the target-cell after {} steps, which is {} the solution-path-length{}."
 
 def getDurTimeUnit(duration):
@@ -278,20 +396,178 @@ def _get_args() -> argparse.Namespace:
     parser.add_argument(   'axisValues', nargs = '*', type = int, help = AXIS_HELP_MSG)
     parser.add_argument('-x', '--xaxis', nargs = 1,   type = int, help = "cell count value for x-axis")
     parser.add_argument('-y', '--yaxis', nargs = 1,   type = int, help = "cell count value for y-axis")
+    parser.add_argument('-v', '--viewport', type = _parseSize, help = VIEWPORT_HELP_MSG)
+    parser.add_argument('-a', '--ansi', action = 'store_true', help = ANSI_HELP_MSG)
+    parser.add_argument('-g', '--algorithm', default = "dfs", choices = Generator.ALGORITHMS, help = ALGORITHM_HELP_MSG)
+    parser.add_argument('--seed',       type = int, help = "seed to reproduce the mazes and players (default: random)")
+    parser.add_argument('-l', '--length',   type = _parseLength, help = LENGTH_HELP_MSG)
+    parser.add_argument('-b', '--braid',    type = _parseRatio, help = BRAID_HELP_MSG)
+    parser.add_argument('-r', '--record',   metavar = 'PATH', help = RECORD_HELP_MSG)
+    parser.add_argument('-i', '--image',    metavar = 'PATH', help = IMAGE_HELP_MSG)
+    parser.add_argument('--scale',      type = int, default = 1, help = "pixel count of a wall or floor unit of the image")
+    parser.add_argument('--profile',    choices = PROFILE_MODES, help = PROFILE_HELP_MSG)
+    parser.add_argument('--metrics',    metavar = 'PATH', help = METRICS_HELP_MSG)
+    parser.add_argument('-s', '--stream', nargs = 2,  type = int, metavar = ('X', 'Y'), help = STREAM_HELP_MSG)
     return parser.parse_args()
 
+def _parseSize(size:str) -> tuple:
+    """ Converts a size-string like 40x20 to the tuple (40, 20), used as argparse-type. """
+    try:
+        width, height = (int(value) for value in size.lower().split("x"))
+    except ValueError:
+        raise argparse.ArgumentTypeError("size must be given as WIDTHxHEIGHT, i.e. 40x20")
+    if width < 1 or height < 1:
+        raise argparse.ArgumentTypeError("width and height of the size must be greater than 0")
+    return width, height
+
+def _parseRatio(ratio:str) -> float:
+    """ Converts a ratio-string to a float between 0 and 1, used as argparse-type. """
+    try:
+        value = float(ratio)
+    except ValueError:
+        raise argparse.ArgumentTypeError("ratio must be a number")
+    if not 0 <= value <= 1:
+        raise argparse.ArgumentTypeError("ratio must be between 0 and 1")
+    return value
+
+def _parseLength(length:str) -> int:
+    """ Converts a length-string to an int, 'max' to 0 (the diameter of the maze), used as argparse-type. """
+    if length.lower() == "max":
+        return 0
+    try:
+        value = int(length)
+    except ValueError:
+        raise argparse.ArgumentTypeError("length must be an integer or 'max'")
+    if value < 1:
+        raise argparse.ArgumentTypeError("length must be greater than 0")
+    return value
+
+def _get_batch_args(arguments) -> argparse.Namespace:
+    """ Parses the arguments of the non-interactive batch subcommand: mazegame.py batch --count 10000 ... """
+    parser = argparse.ArgumentParser( prog = 'mazegame.py batch', description = '\tNon-interactive batch generation',
+                                      formatter_class = argparse.ArgumentDefaultsHelpFormatter)
+    parser.add_argument('--count',     type = int, default = 100, help = "count of mazes to generate")
+    parser.add_argument('--size',      type = _parseSize, default = (10, 10), help = "size of every maze, i.e. 200x200")
+    parser.add_argument('--seed',      type = int, default = 0, help = "seed of the batch, every maze gets its own seed")
+    parser.add_argument('--workers',   type = int, default = None, help = "count of worker processes (default: cores)")
+    parser.add_argument('--out',       default = "mazes", help = "directory the mazes and index.csv are written to")
+    parser.add_argument('--algorithm', default = "dfs", choices = Generator.ALGORITHMS, help = ALGORITHM_HELP_MSG)
+    args = parser.parse_args(arguments)
+    if args.count < 1 or args.size[0] * args.size[1] < 2:
+        parser.error("count must be greater than 0 and every maze needs at least 2 cells")
+    return args
+
+def _get_serve_args(arguments) -> argparse.Namespace:
+    """ Parses the arguments of the serve subcommand: mazegame.py serve --port 8023 """
+    parser = argparse.ArgumentParser( prog = 'mazegame.py serve', description = '\tMulti-session maze-game server',
+                                      formatter_class = argparse.ArgumentDefaultsHelpFormatter)
+    parser.add_argument('--host',   default = "127.0.0.1", help = "address the server listens on")
+    parser.add_argument('--port',   type = int, default = 8023, help = "TCP-port the server listens on")
+    parser.add_argument('--memory', type = int, default = 256, help = "memory budget of the shared mazes in MiB")
+    return parser.parse_args(arguments)
+
+def _get_bench_args(arguments) -> argparse.Namespace:
+    """ Parses the arguments of the bench subcommand: mazegame.py bench --sizes 10x10 100x100 --baseline base.json """
+    parser = argparse.ArgumentParser( prog = 'mazegame.py bench', description = '\tBenchmark of generation, '
+                                      'rendering and solving', formatter_class = argparse.ArgumentDefaultsHelpFormatter)
+    parser.add_argument('--sizes',     type = _parseSize, nargs = '+', default = DEFAULT_SIZES,
+                        help = "maze sizes to sweep, i.e. 10x10 100x100")
+    parser.add_argument('--repeats',   type = int, default = 5, help = "timed runs per stage")
+    parser.add_argument('--warmup',    type = int, default = 1, help = "untimed runs per stage before the timed runs")
+    parser.add_argument('--algorithm', default = "dfs", choices = Generator.ALGORITHMS, help = ALGORITHM_HELP_MSG)
+    parser.add_argument('--seed',      type = int, default = 0, help = "seed of the benchmarked mazes")
+    parser.add_argument('--out',       default = None, help = "file the JSON-report is written to (default: stdout)")
+    parser.add_argument('--baseline',  default = None, help = "JSON-report of an earlier run to flag regressions")
+    parser.add_argument('--tolerance', type = float, default = 0.1, help = "allowed slowdown against the baseline")
+    parser.add_argument('--no-memory', action = 'store_true', help = "skip the peak memory tracing (tracemalloc)")
+    args = parser.parse_args(arguments)
+    if args.repeats < 1 or args.warmup < 0 or args.tolerance < 0:
+        parser.error("repeats must be greater than 0, warmup and tolerance must not be negative")
+    if any(width * height < 2 for width, height in args.sizes):
+        parser.error("every size needs at least 2 cells")
+    return args
+
+def _get_stats_args(arguments) -> argparse.Namespace:
+    """ Parses the arguments of the stats subcommand: mazegame.py stats --size 4000x4000 OR mazegame.py stats m.maze """
+    parser = argparse.ArgumentParser( prog = 'mazegame.py stats', description = '\tStructure statistics of a maze',
+                                      formatter_class = argparse.ArgumentDefaultsHelpFormatter)
+    parser.add_argument('file',        nargs = '?', help = "maze-file saved by Maze.save (default: generate a maze)")
+    parser.add_argument('--size',      type = _parseSize, default = (100, 100), help = "size of the generated maze")
+    parser.add_argument('--seed',      type = int, default = None, help = "seed of the generated maze")
+    parser.add_argument('--algorithm', default = "dfs", choices = Generator.ALGORITHMS, help = ALGORITHM_HELP_MSG)
+    return parser.parse_args(arguments)
+
+def _get_replay_args(arguments) -> argparse.Namespace:
+    """ Parses the arguments of the replay subcommand: mazegame.py replay sessions.log """
+    parser = argparse.ArgumentParser( prog = 'mazegame.py replay', description = '\tHeadless verification of '
+                                      'recorded games', formatter_class = argparse.ArgumentDefaultsHelpFormatter)
+    parser.add_argument('log',      help = "session-log recorded by mazegame.py --record")
+    parser.add_argument('--memory', type = int, default = 256, help = "memory budget of the regenerated mazes in MiB")
+    parser.add_argument('--max-cells', type = int, default = 4_000_000,
+                        help = "maximum cell count of a recorded maze, larger mazes are invalid sessions")
+    return parser.parse_args(arguments)
+
 if __name__ == '__main__':
+    if sys.argv[1:2] == ["batch"]:                              # program start: mazegame.py batch --count 10000 ...
+        batchArgs = _get_batch_args(sys.argv[2:])
+        runBatch(batchArgs.count, *batchArgs.size, batchArgs.seed, batchArgs.workers, batchArgs.out, batchArgs.algorithm)
+        sys.exit()
+    if sys.argv[1:2] == ["serve"]:                              # program start: mazegame.py serve --port 8023
+        serveArgs = _get_serve_args(sys.argv[2:])
+        runServer(serveArgs.host, serveArgs.port, serveArgs.memory * 1024 * 1024)
+        sys.exit()
+    if sys.argv[1:2] == ["bench"]:                              # program start: mazegame.py bench --out bench.json
+        benchArgs = _get_bench_args(sys.argv[2:])
+        regressions = runBench(benchArgs.sizes, benchArgs.repeats, benchArgs.warmup, benchArgs.algorithm,
+                               benchArgs.seed, benchArgs.out, benchArgs.baseline, benchArgs.tolerance,
+                               not benchArgs.no_memory)
+        sys.exit(1 if regressions else 0)
+    if sys.argv[1:2] == ["stats"]:                              # program start: mazegame.py stats --size 4000x4000
+        statsArgs = _get_stats_args(sys.argv[2:])
+        if statsArgs.file:
+            try:
+                maze = Maze.load(statsArgs.file)
+            except ValueError as error:                         # no maze-file or a truncated one
+                print(f" Error: {error}", file=sys.stderr)
+                sys.exit(2)
+            stats = analyzeMaze(maze)
+        else:                                                   # the solution-share of the two farthest cells
+            generator = Generator(Maze(*statsArgs.size, seed=statsArgs.seed), statsArgs.algorithm)
+            stats = analyzeMaze(generator.maze, generator.getDiameter()[2])
+        print(json.dumps(stats, indent=2))
+        sys.exit()
+    if sys.argv[1:2] == ["replay"]:                             # program start: mazegame.py replay sessions.log
+        replayArgs = _get_replay_args(sys.argv[2:])
+        try:
+            summary = Replayer(replayArgs.memory * 1024 * 1024, replayArgs.max_cells).replayLog(replayArgs.log)
+        except ValueError as error:                             # a broken framing of the log, not a single session
+            print(f" Error: {error}", file=sys.stderr)
+            sys.exit(2)
+        print(json.dumps(summary, indent=2))
+        sys.exit(1 if summary["invalid"] else 0)
     args = _get_args()                                          # argument parser
-    if args.xaxis and args.yaxis:                               # program start: mazegame.py -x 10 -y 11
-        MazeGame().run(args.xaxis[0], args.yaxis[0], PARAM_MSG.format(args.xaxis[0] * args.yaxis[0], args.xaxis[0], args.yaxis[0]))
-    elif (args.xaxis and not args.yaxis) or (not args.xaxis and args.yaxis):
-        print(ERROR_ONLY_1_PARAM)                               # program start: mazegame.py -x 10 OR mazegame.py -y 11
-        MazeGame().run()
-    elif len(args.axisValues) == 2:                             # program start: mazegame.py 10 11
-        MazeGame().run(args.axisValues[0], args.axisValues[1], PARAM_MSG.format(args.axisValues[0] * args.axisValues[1], args.axisValues[0], args.axisValues[1]))
-    elif len(args.axisValues) > 2:                              # program start: mazegame.py 10 11 12
-        print(ERROR_OVER_2_PARAM)
-        MazeGame().run()
-    elif len(args.axisValues) == 1:                             # program start: mazegame.py 10
-        print(ERROR_ONLY_1_PARAM)
-        MazeGame().run()
+    with Profiling(args.profile):                               # program start: mazegame.py 10 10 --profile sample
+        if args.stream:                                         # program start: mazegame.py --stream 1000 10000000
+            if args.stream[0] < 1 or args.stream[1] < 1:
+                print(ERROR_STREAM_SIZE)
+            elif args.image:
+                with open(args.image, "wb") as file:
+                    writer = writePbm if args.image.lower().endswith(".pbm") else writePng
+                    writer(EllerGenerator(*args.stream, args.seed).getRows(), *args.stream, file, max(1, args.scale))
+            else:
+                writeRows(EllerGenerator(*args.stream, args.seed).getRows(), sys.stdout)
+        elif args.xaxis and args.yaxis:                           # program start: mazegame.py -x 10 -y 11
+            MazeGame(args.viewport, args.ansi, args.algorithm, args.seed, args.length, args.braid, args.record).run(args.xaxis[0], args.yaxis[0], PARAM_MSG.format(args.xaxis[0] * args.yaxis[0], args.xaxis[0], args.yaxis[0]))
+        elif (args.xaxis and not args.yaxis) or (not args.xaxis and args.yaxis):
+            print(ERROR_ONLY_1_PARAM)                           # program start: mazegame.py -x 10 OR mazegame.py -y 11
+            MazeGame(args.viewport, args.ansi, args.algorithm, args.seed, args.length, args.braid, args.record).run()
+        elif len(args.axisValues) == 2:                         # program start: mazegame.py 10 11
+            MazeGame(args.viewport, args.ansi, args.algorithm, args.seed, args.length, args.braid, args.record).run(args.axisValues[0], args.axisValues[1], PARAM_MSG.format(args.axisValues[0] * args.axisValues[1], args.axisValues[0], args.axisValues[1]))
+        elif len(args.axisValues) > 2:                          # program start: mazegame.py 10 11 12
+            print(ERROR_OVER_2_PARAM)
+            MazeGame(args.viewport, args.ansi, args.algorithm, args.seed, args.length, args.braid, args.record).run()
+        elif len(args.axisValues) == 1:                         # program start: mazegame.py 10
+            print(ERROR_ONLY_1_PARAM)
+            MazeGame(args.viewport, args.ansi, args.algorithm, args.seed, args.length, args.braid, args.record).run()
+    if args.metrics:                                        # program start: mazegame.py 10 10 --metrics m.prom
+        METRICS.writeSnapshot(args.metrics)
@@ -0,0 +1,248 @@
+import cProfile
+import functools
+import json
+import os
+import pstats
+import sys
+import threading
+import time
+from bisect import bisect_left
+from collections import Counter
+
+# upper bounds of the latency-buckets in nanoseconds: 1µs, 2.5µs, 5µs, 10µs ... 5s, 10s and +Inf for the rest
+BUCKET_BOUNDS = tuple(int(mantissa * 10 ** exponent) for exponent in range(3, 10) for mantissa in (1, 2.5, 5)) \
+                + (10 ** 10,)
+PROFILE_ENV = "MAZE_PROFILE"                 # MAZE_PROFILE=cprofile or MAZE_PROFILE=sample turns on a profiler
+PROFILE_MODES = ("cprofile", "sample")
+
+
+class Histogram:
+    def __init__(self):
+        """ Distribution of the durations of a timer in the fixed BUCKET_BOUNDS, besides count, sum, min, max and last.
+
+        An observation costs one bisect over the bounds, the memory stays constant no matter how often it's observed.
+        """
+        self.buckets = [0] * (len(BUCKET_BOUNDS) + 1)    # the last bucket counts the durations above all bounds
+        self.count, self.sum, self.min, self.max, self.last = 0, 0, None, None, None
+
+    def observe(self, duration):
+        self.buckets[bisect_left(BUCKET_BOUNDS, duration)] += 1
+        self.count += 1
+        self.sum += duration
+        self.min = duration if self.min is None else min(self.min, duration)
+        self.max = duration if self.max is None else max(self.max, duration)
+        self.last = duration
+
+    def getPercentile(self, percent):
+        """ :return: the upper bound of the bucket holding the percentile (the max in the +Inf-bucket), None if empty """
+        if self.count == 0:
+            return None
+        rank, seen = percent / 100 * self.count, 0
+        for index, bucketCount in enumerate(self.buckets):
+            seen += bucketCount
+            if seen >= rank and bucketCount:
+                return min(BUCKET_BOUNDS[index], self.max) if index < len(BUCKET_BOUNDS) else self.max
+        return self.max
+
+    def getSnapshot(self):
+        return {"count": self.count, "sumNs": self.sum, "minNs": self.min, "maxNs": self.max, "lastNs": self.last,
+                "p50Ns": self.getPercentile(50), "p95Ns": self.getPercentile(95), "p99Ns": self.getPercentile(99),
+                "buckets": dict(zip([str(bound) for bound in BUCKET_BOUNDS] + ["+Inf"], self.buckets))}
+
+
+class Metrics:
+    def __init__(self):
+        """ Registry of named timers (each a Histogram of nanosecond durations) and counters.
+
+        Timers are observed by span (a context manager) or timed (a decorator) around the hot paths, so every phase
+        keeps its whole latency distribution instead of only the duration of its last call.
+        """
+        self.timers, self.counters = {}, {}
+        self._lock = threading.Lock()            # the server and the sampling profiler may observe from other threads
+
+    def observe(self, name, duration):
+        """ Records a duration in nanoseconds of the timer name, which is created on its first observation. """
+        with self._lock:
+            timer = self.timers.get(name)
+            if timer is None:
+                timer = self.timers[name] = Histogram()
+            timer.observe(duration)
+
+    def increment(self, name, value=1):
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + value
+
+    def span(self, name):
+        """ Times the block of a with-statement: with METRICS.span("solve"): ... """
+        return _Span(self, name)
+
+    def timed(self, name):
+        """ Decorator timing every call of the function as the timer name. """
+        def decorator(function):
+            @functools.wraps(function)
+            def wrapper(*args, **kwargs):
+                startTime = time.perf_counter_ns()
+                try:
+                    return function(*args, **kwargs)
+                finally:
+                    self.observe(name, time.perf_counter_ns() - startTime)
+            return wrapper
+        return decorator
+
+    def getLast(self, name):
+        """ :return: the duration of the last observation of the timer in nanoseconds, 0 if it was never observed """
+        timer = self.timers.get(name)
+        return 0 if timer is None else timer.last
+
+    def getCount(self, name):
+        return self.counters.get(name, 0)
+
+    def reset(self):
+        with self._lock:
+            self.timers.clear()
+            self.counters.clear()
+
+    def getSnapshot(self) -> dict:
+        with self._lock:
+            return {"timers": {name: timer.getSnapshot() for name, timer in sorted(self.timers.items())},
+                    "counters": dict(sorted(self.counters.items()))}
+
+    def toJson(self):
+        return json.dumps(self.getSnapshot(), indent=2)
+
+    def toPrometheus(self, prefix="maze"):
+        """ Exports the snapshot in the Prometheus text format, the timers as histograms in seconds.
+
+        :return: the text with one metric-family per timer (<prefix>_<name>_seconds) and counter (<prefix>_<name>_total)
+        """
+        lines = []
+        with self._lock:
+            for name, timer in sorted(self.timers.items()):
+                metric = "{}_{}_seconds".format(prefix, _getMetricName(name))
+                lines.append("# TYPE {} histogram".format(metric))
+                cumulative = 0
+                for bound, bucketCount in zip(BUCKET_BOUNDS, timer.buckets):
+                    cumulative += bucketCount
+                    lines.append('{}_bucket{{le="{:g}"}} {}'.format(metric, bound / 1e9, cumulative))
+                lines.append('{}_bucket{{le="+Inf"}} {}'.format(metric, timer.count))
+                lines.append("{}_sum {:.9f}".format(metric, timer.sum / 1e9))
+                lines.append("{}_count {}".format(metric, timer.count))
+            for name, value in sorted(self.counters.items()):
+                metric = "{}_{}_total".format(prefix, _getMetricName(name))
+                lines.append("# TYPE {} counter".format(metric))
+                lines.append("{} {}".format(metric, value))
+        return "\n".join(lines) + "\n"
+
+    def writeSnapshot(self, path):
+        """ Writes the snapshot to the file, in the Prometheus text format if it ends with .prom, else as JSON. """
+        with open(path, "w", encoding="utf-8") as file:
+            file.write(self.toPrometheus() if path.endswith(".prom") else self.toJson())
+
+
+class _Span:
+    __slots__ = ("metrics", "name", "startTime")
+
+    def __init__(self, metrics, name):
+        self.metrics, self.name = metrics, name
+
+    def __enter__(self):
+        self.startTime = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, *exception):
+        self.metrics.observe(self.name, time.perf_counter_ns() - self.startTime)
+        return False
+
+
+def _getMetricName(name):
+    return "".join(char if char.isalnum() else "_" for char in name)
+
+
+METRICS = Metrics()                          # the registry of the process, shared by all modules
+span = METRICS.span
+timed = METRICS.timed
+
+
+class SamplingProfiler:
+    def __init__(self, interval=0.001, thread=None):
+        """ Statistical profiler, which samples the call-stack of a thread in a background-thread every interval.
+
+        Unlike cProfile it doesn't slow down every function call, so it's usable on a running server. A function's
+        share of the samples estimates its share of the run-time.
+
+        :param interval: seconds between two samples
+        :param thread: the thread to sample, the calling thread if None
+        """
+        self.interval, self.threadId = interval, (thread or threading.current_thread()).ident
+        self.samples, self.selfSamples, self.sampleCount = Counter(), Counter(), 0
+        self._stopEvent, self._thread = threading.Event(), None
+
+    def start(self):
+        self._thread = threading.Thread(target=self._sample, name="sampling-profiler", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stopEvent.set()
+        if self._thread is not None:
+            self._thread.join()
+
+    def _sample(self):
+        while not self._stopEvent.wait(self.interval):
+            frame = sys._current_frames().get(self.threadId)
+            if frame is None:
+                continue
+            self.sampleCount += 1
+            self.selfSamples[_getFrameName(frame)] += 1
+            functions = set()
+            while frame is not None:             # every function on the stack is counted once per sample (inclusive)
+                functions.add(_getFrameName(frame))
+                frame = frame.f_back
+            self.samples.update(functions)
+
+    def writeStats(self, file, limit=25):
+        file.write(" {} samples every {:g} ms\n {:>7} {:>7}  function\n".format(
+            self.sampleCount, self.interval * 1000, "total%", "self%"))
+        for name, count in self.samples.most_common(limit):
+            file.write(" {:>6.1f}% {:>6.1f}%  {}\n".format(100 * count / max(self.sampleCount, 1),
+                                                          100 * self.selfSamples[name] / max(self.sampleCount, 1),
+                                                          name))
+
+
+def _getFrameName(frame):
+    code = frame.f_code
+    return "{}:{}({})".format(os.path.basename(code.co_filename), code.co_firstlineno, code.co_name)
+
+
+class Profiling:
+    def __init__(self, mode=None, file=sys.stderr):
+        """ Context manager profiling its block with cProfile or the SamplingProfiler and writing the stats at its end.
+
+        :param mode: one of PROFILE_MODES, the value of the environment variable MAZE_PROFILE if None, off if neither
+         is set
+        :param file: the output of the profiling stats
+        """
+        self.mode = mode or os.environ.get(PROFILE_ENV) or None
+        if self.mode is not None and self.mode not in PROFILE_MODES:
+            raise ValueError("unknown profiling mode '{}', choose one of {}".format(self.mode,
+                                                                                  ", ".join(PROFILE_MODES)))
+        self.file, self.profiler = file, None
+
+    def __enter__(self):
+        match self.mode:
+            case "cprofile":
+                self.profiler = cProfile.Profile()
+                self.profiler.enable()
+            case "sample":
+                self.profiler = SamplingProfiler()
+                self.profiler.start()
+        return self
+
+    def __exit__(self, *exception):
+        match self.mode:
+            case "cprofile":
+                self.profiler.disable()
+                pstats.Stats(self.profiler, stream=self.file).sort_stats("cumulative").print_stats(25)
+            case "sample":
+                self.profiler.stop()
+                self.profiler.writeStats(self.file)
+        return False
@@ -1,9 +1,32 @@
+import mmap
+import random
+import struct
+from array import array
+from metrics import timed
+
+NORTH, WEST, VISITED = 1, 2, 4     # bit-flags of a cell in Maze.walls
+DIRECTION_X = (1, 0, -1, 0)        # right, down, left, up
+DIRECTION_Y = (0, 1, 0, -1)
+WALL_CONNECTION = (" ", "╹", "╸", "┛", "╻", "┃", "┓", "┫", "╺", "┗", "━", "┻", "┏", "┣", "┳", "╋")
+
+# binary maze-file: magic, version, x- and y-cell count, seed, algorithm, followed by 2 wall-bits per cell
+FILE_HEADER = struct.Struct("<4sB3xQQQ16s")
+FILE_MAGIC, FILE_VERSION = b"MAZE", 1
+UNPACKED_BYTES = tuple(bytes((byte >> shift) & (NORTH | WEST) for shift in (0, 2, 4, 6)) for byte in range(256))
+
+
 class Node:
-    def __init__(self, x, y, maxX, maxY):
-        self.x, self.y = x, y
-        self.north, self.west, self.visited = True, True, False
-        self.neighbors = []
-        self._setNeighbors(maxX - 1, maxY - 1)
+    """ Thin view over one cell of the packed Maze.walls-bytearray.
+
+    A Node holds no wall- or visited-state itself, it only stores its coordinates and reads/writes the bits of its
+    cell in the maze it belongs to. Two Nodes of the same maze and coordinate are equal and share the same hash, so
+    freshly created views can be used as dictionary-keys interchangeably.
+    """
+    __slots__ = ("maze", "x", "y", "id")
+
+    def __init__(self, maze, x, y):
+        self.maze, self.x, self.y = maze, x, y
+        self.id = y * maze.sizeX + x
 
     def getX(self):
         return self.x
@@ -11,107 +34,400 @@ class Node:
     def getY(self):
         return self.y
 
+    def getId(self):
+        return self.id
+
     def hasNorth(self):
-        return self.north
+        return self.maze.walls[self.id] & NORTH != 0
 
     def hasWest(self):
-        return self.west
+        return self.maze.walls[self.id] & WEST != 0
 
     def setNorth(self, state):
-        self.north = state
+        self._setBit(NORTH, state)
 
     def setWest(self, state):
-        self.west = state
+        self._setBit(WEST, state)
 
     def isVisited(self):
-        return self.visited
+        return self.maze.walls[self.id] & VISITED != 0
 
     def setVisited(self, state):
-        self.visited = state
+        self._setBit(VISITED, state)
 
     def hasNeighbors(self):
-        return len(self.neighbors) > 0
+        return len(self.getNeighbors()) > 0
 
     def getNeighbors(self):
-        return self.neighbors
+        return self.maze.getNeighbors(self.x, self.y)
 
-    def _setNeighbors(self, sizeX, sizeY):
-        modX = (1,0,-1,0)
-        modY = (0,1,0,-1)
-        for directionIndex in range(4):
-            x = self.x + modX[directionIndex]
-            y = self.y + modY[directionIndex]
-            if 0 <= x < sizeX and 0 <= y < sizeY:
-                self.neighbors.append((x, y, directionIndex))
+    def _setBit(self, bit, state):
+        if state:
+            self.maze.walls[self.id] |= bit
+        else:
+            self.maze.walls[self.id] &= ~bit
+
+    def __eq__(self, other):
+        return isinstance(other, Node) and self.id == other.id and self.maze is other.maze
+
+    def __hash__(self):
+        return self.id
 
     def __repr__(self):
         return "|x={}, y={}| ".format(self.x, self.y)
 
 
+class PackedWalls:
+    def __init__(self, data, offset, cellCount):
+        """ Read/write view over walls packed with 2 bits (NORTH and WEST) per cell, i.e. the memory-mapped maze-file.
+
+        Cells are only decoded when they are accessed, so a view over a multi-GB file is created instantly. It can be
+        used like the Maze.walls-bytearray by index, but without the VISITED-bit.
+
+        :param data: a bytes-like object or mmap with 4 cells per byte, the first cell in the lowest 2 bits
+        :param offset: the index of the byte in data, which holds the first cell
+        :param cellCount: the count of cells
+        """
+        self.data, self.offset, self.cellCount = data, offset, cellCount
+
+    def __getitem__(self, cellId):
+        if not -self.cellCount <= cellId < self.cellCount:
+            raise IndexError("cell-id out of range")
+        cellId %= self.cellCount
+        return self.data[self.offset + (cellId >> 2)] >> ((cellId & 3) << 1) & (NORTH | WEST)
+
+    def __setitem__(self, cellId, cellWalls):
+        if not -self.cellCount <= cellId < self.cellCount:
+            raise IndexError("cell-id out of range")
+        cellId %= self.cellCount
+        shift, index = (cellId & 3) << 1, self.offset + (cellId >> 2)
+        self.data[index] = self.data[index] & ~((NORTH | WEST) << shift) & 0xFF | (cellWalls & (NORTH | WEST)) << shift
+
+    def __len__(self):
+        return self.cellCount
+
+    def decode(self, start, stop) -> bytes:
+        """ :return: the walls of the cells from start to stop (exclusive) with one byte per cell """
+        first, last = start >> 2, (stop + 3) >> 2
+        unpacked = b"".join(map(UNPACKED_BYTES.__getitem__, self.data[self.offset + first:self.offset + last]))
+        return unpacked[start - (first << 2):stop - (first << 2)]
+
+    def getPackedBytes(self) -> bytes:
+        return bytes(self.data[self.offset:self.offset + (self.cellCount + 3) // 4])
+
+
+def packWalls(walls) -> bytes:
+    """ Packs the NORTH- and WEST-bits of the walls (one byte per cell) into 2 bits per cell, 4 cells per byte.
+
+    Each of the 4 cells of a byte is selected with a strided slice, shifted into its bit-position with translate and
+    merged by adding the bytes as one big integer, as the bits of the 4 cells never overlap.
+    """
+    if isinstance(walls, PackedWalls):
+        return walls.getPackedBytes()
+    walls = bytes(walls) + bytes(-len(walls) % 4)
+    packed = 0
+    for position in range(4):
+        shifted = walls[position::4].translate(bytes((byte & (NORTH | WEST)) << (2 * position) for byte in range(256)))
+        packed += int.from_bytes(shifted, "little")
+    return packed.to_bytes(len(walls) // 4, "little")
+
+
 class Maze: 
-    def __init__(self, sizeX, sizeY):
+    def __init__(self, sizeX, sizeY, walls=None, seed=None):
+        """ Stores the walls of the maze packed in one bytearray with one byte (NORTH-, WEST- and VISITED-bit) per cell.
+
+        The cell at x, y is stored at index y * self.sizeX + x. Nodes are only created on demand by getNode as views
+        over this bytearray, the neighbors of a cell are computed on the fly by getNeighbors.
+
+        :param walls: the already generated walls (i.e. PackedWalls of a loaded maze) instead of a new bytearray
+        :param seed: the seed of self.rng, which generates the maze reproducibly, a random seed if None
+        """
         self.sizeX, self.sizeY = sizeX+1, sizeY+1
-        self.nodes = [[Node(x, y, sizeX+1, sizeY+1) for x in range(sizeX+1)] for y in range(sizeY+1)]
-        self.cells = [["" for x in range(sizeX+1)] for y in range(2 * (sizeY+1))]
-        self.wallConnection = (" ", "╹", "╸", "┛", "╻", "┃", "┓", "┫", "╺", "┗", "━", "┻", "┏", "┣", "┳", "╋")
-        self._set_South_East_MazeBoundaries()
+        self.seed = random.getrandbits(63) if seed is None else seed
+        self.rng = random.Random(self.seed)
+        self.algorithm = ""                      # stored in the header of a saved maze (like the seed), set by the Generator
+        self.walls = bytearray([NORTH | WEST]) * (self.sizeX * self.sizeY) if walls is None else walls
+        self.cells, self._rows = None, None      # built lazily by setCells, _rows caches the text-rows (None = dirty)
+        self.markers = {}                        # cell-id → 3 character wide marker (i.e. "PLY") drawn into the cell
+        self.changedCells = None                 # set of cell-ids with changed markers, tracked once it's a set
+        self.wallConnection = WALL_CONNECTION
+        if walls is None:
+            self._set_South_East_MazeBoundaries()
 
     def _set_South_East_MazeBoundaries(self):
         # sets south (bottom) maze boundary by deleting every vertical west-wall (left cell-wall) of the last row
-        for x in range(self.sizeX):
-            self.nodes[self.sizeY-1][x].setWest(False)
-            self.nodes[self.sizeY-1][x].setVisited(True)
+        self.walls[(self.sizeY-1) * self.sizeX:] = bytes([NORTH | VISITED]) * self.sizeX
 
         # sets east (right) maze boundary by deleting every horizontal north-wall (top cell-wall) of the last column
-        for y in range(self.sizeY):
-            self.nodes[y][self.sizeX-1].setNorth(False)
-            self.nodes[y][self.sizeX-1].setVisited(True)
+        self.walls[self.sizeX-1::self.sizeX] = bytes([WEST | VISITED]) * self.sizeY
+        self.walls[-1] = VISITED
+
+    def save(self, path):
+        """ Saves the maze in the binary maze-file format: a header (FILE_HEADER) with the cell counts of both axes,
+        the seed and the algorithm, followed by the NORTH- and WEST-bit of every cell packed into 2 bits. """
+        with open(path, "wb") as file:
+            file.write(FILE_HEADER.pack(FILE_MAGIC, FILE_VERSION, self.sizeX-1, self.sizeY-1, self.seed,
+                                        self.algorithm.encode("ascii")))
+            file.write(packWalls(self.walls))
+
+    @classmethod
+    def load(cls, path):
+        """ Loads a maze saved by save by memory-mapping the file, so no cell is read before it's accessed.
+
+        The mapping is private (copy-on-write): changes of the walls aren't written back to the file.
+
+        :return: a Maze with PackedWalls over the mapped file as walls
+        :raise ValueError: if the file isn't a maze-file or it's truncated
+        """
+        with open(path, "rb") as file:
+            data = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_COPY)
+        fileSize = len(data)
+        if fileSize < FILE_HEADER.size:
+            data.close()
+            raise ValueError("{} is truncated: {} of {} header bytes".format(path, fileSize, FILE_HEADER.size))
+        magic, version, sizeX, sizeY, seed, algorithm = FILE_HEADER.unpack_from(data)
+        if magic != FILE_MAGIC or version != FILE_VERSION:
+            data.close()
+            raise ValueError("{} isn't a maze-file of version {}".format(path, FILE_VERSION))
+        wallsSize = ((sizeX+1) * (sizeY+1) + 3) // 4
+        if fileSize < FILE_HEADER.size + wallsSize:
+            data.close()
+            raise ValueError("{} is truncated: {} of {} wall bytes of a {}x{} maze".format(
+                path, fileSize - FILE_HEADER.size, wallsSize, sizeX, sizeY))
+        maze = cls(sizeX, sizeY, PackedWalls(data, FILE_HEADER.size, (sizeX+1) * (sizeY+1)), seed)
+        maze.algorithm = algorithm.rstrip(b"\0").decode("ascii")
+        return maze
 
     def getNodes(self):
-        return self.nodes
+        # builds a grid of Node-views, which costs O(cells) - prefer getNode for single cells
+        return [[Node(self, x, y) for x in range(self.sizeX)] for y in range(self.sizeY)]
 
     def getNode(self, x, y):
-        return self.nodes[y][x]
+        return Node(self, x, y)
 
-    def _getIndex(self, x, y):
-        binaryCode = "{}{}{}{}".format(
-            1 if self.nodes[y][x].hasNorth() else 0,
-            1 if self.nodes[y][x].hasWest() else 0,
-            1 if x-1 >= 0 and self.nodes[y][x-1].hasNorth() else 0,
-            1 if y-1 >= 0 and self.nodes[y-1][x].hasWest() else 0
-        )
-        return int(binaryCode, 2)
+    def getNodeById(self, cellId):
+        return Node(self, cellId % self.sizeX, cellId // self.sizeX)
+
+    def getId(self, x, y):
+        return y * self.sizeX + x
+
+    def getNeighbors(self, x, y):
+        """ Computes the neighbors of the cell at x, y within the maze (without the south-east boundary cells).
 
+        :return: a list of (x, y, direction)-tuples, where direction indexes DIRECTION_X and DIRECTION_Y
+        """
+        neighbors = []
+        for directionIndex in range(4):
+            neighborX = x + DIRECTION_X[directionIndex]
+            neighborY = y + DIRECTION_Y[directionIndex]
+            if 0 <= neighborX < self.sizeX - 1 and 0 <= neighborY < self.sizeY - 1:
+                neighbors.append((neighborX, neighborY, directionIndex))
+        return neighbors
+
+    def _getIndex(self, x, y):
+        walls, cellId = self.walls, y * self.sizeX + x
+        return (walls[cellId] & NORTH) << 3 | (walls[cellId] & WEST) << 1 \
+            | ((walls[cellId-1] & NORTH) << 1 if x-1 >= 0 else 0) \
+            | ((walls[cellId-self.sizeX] & WEST) >> 1 if y-1 >= 0 else 0)
+
+    def _getCellStrings(self, x, y, markers):
+        """ Builds the two strings of the cell at x, y: the upper with the north-wall and the lower with the west-wall and
+        the cell's marker. """
+        cellId = y * self.sizeX + x
+        cellWalls = self.walls[cellId]
+        return "{}{}".format(self.wallConnection[self._getIndex(x, y)], "━━━" if cellWalls & NORTH else "   "), \
+               "{}{}".format("┃" if cellWalls & WEST else " ", markers.get(cellId, "   "))
+
+    @timed("maze.set_cells")
     def setCells(self):
+        self.cells = [["" for x in range(self.sizeX)] for y in range(2 * self.sizeY)]
         for y in range(self.sizeY):
             for x in range(self.sizeX):
-                self.cells[2 * y][x] = "{}{}".format(self.wallConnection[self._getIndex(x, y)],
-                                                     "━━━" if self.nodes[y][x].hasNorth() else "   ")
-                self.cells[2 * y + 1][x] = "{}   ".format("┃" if self.nodes[y][x].hasWest() else " ")
+                self.cells[2 * y][x], self.cells[2 * y + 1][x] = self._getCellStrings(x, y, self.markers)
+        self._rows = [None] * len(self.cells)
 
     def setMarker(self, x, y, marker):
-        self.cells[2 * y + 1][x] = self.cells[2 * y + 1][x][:1] + marker
+        cellId = y * self.sizeX + x
+        if marker.isspace():
+            self.markers.pop(cellId, None)
+        else:
+            self.markers[cellId] = marker
+        if self.changedCells is not None:
+            self.changedCells.add(cellId)
+        if self.cells is not None:
+            self.cells[2 * y + 1][x] = self.cells[2 * y + 1][x][:1] + marker
+            self._rows[2 * y + 1] = None
+
+    def popChangedCells(self):
+        """ Starts tracking the cells changed by setMarker on the first call.
+
+        :return: the cell-ids, whose markers changed since the last call
+        """
+        changedCells, self.changedCells = self.changedCells or set(), set()
+        return changedCells
+
+    def _getRow(self, row):
+        # joins the cells of a dirty row once, afterwards the cached text-row is reused until the row changes again
+        if self._rows[row] is None:
+            self._rows[row] = "".join(self.cells[row])
+        return self._rows[row]
+
+    @timed("maze.render")
+    def writeTo(self, file):
+        """ Streams the maze row by row to the file (i.e. sys.stdout) like print(maze) without building one string. """
+        if self.cells is None:
+            self.setCells()
+        for row in range( len(self.cells) - 1 ):     # the last row holds only the empty south boundary cells
+            file.write(self._getRow(row))
+            file.write("\n")
+
+    def getWindow(self, centerX, centerY, width, height):
+        """ Clamps a window of width x height cells centered on centerX, centerY to the maze.
+
+        :return: the left, top, right and bottom cell-coordinates of the window (right and bottom exclusive)
+        """
+        width, height = min(width, self.sizeX - 1), min(height, self.sizeY - 1)
+        left = min(max(centerX - width // 2, 0), self.sizeX - 1 - width)
+        top = min(max(centerY - height // 2, 0), self.sizeY - 1 - height)
+        return left, top, left + width, top + height
+
+    @timed("maze.render_window")
+    def renderWindow(self, left, top, right, bottom, markers=None):
+        """ Renders only the cells of the window, which are built on the fly from the walls without using self.cells.
+
+        The cost depends on the size of the window and not on the size of the maze.
+
+        :param markers: cell-id → marker-mapping drawn into the window, self.markers if None
+        :return: the window as a string, closed by the corner- and wall-characters of the right and bottom cells
+        """
+        markers = self.markers if markers is None else markers
+        lines = []
+        for y in range(top, bottom + 1):
+            upperLine, lowerLine = [], []
+            for x in range(left, right + 1):
+                upperCell, lowerCell = self._getCellStrings(x, y, markers)
+                upperLine.append(upperCell if x < right else upperCell[:1])
+                lowerLine.append(lowerCell if x < right else lowerCell[:1])
+            lines.append("".join(upperLine))
+            if y < bottom:
+                lines.append("".join(lowerLine))
+        return "\n".join(lines)
 
     def __repr__(self):
-        mazeOutputString = ""
-        for y in range( len(self.cells) ):
-            for x in range( len(self.cells[0]) ):
-                mazeOutputString += self.cells[y][x]
-            mazeOutputString += "\n"
-        return mazeOutputString[:-4 * len(self.cells[0]) - 2]
+        if self.cells is None:
+            self.setCells()
+        return "\n".join(self._getRow(row) for row in range( len(self.cells) - 1 ))
 
     def printOutAsArray(self):
+        if self.cells is None:
+            self.setCells()
         arrayString = ""
         for index, row in enumerate(self.cells):
             arrayString += str(row) + (",\n\n" if index % 2 != 0 else ",\n")
         return arrayString
 
 
-import random
+def getMazeRows(maze):
+    """ Yields the rows of the maze in the format of EllerGenerator.getRows, works for a loaded maze (PackedWalls) too.
+
+    Only one row is decoded at a time, so a memory-mapped maze is never unpacked as a whole.
+    """
+    walls, sizeX = maze.walls, maze.sizeX
+    getRow = walls.decode if isinstance(walls, PackedWalls) else lambda start, stop: walls[start:stop]
+    for y in range(maze.sizeY):
+        yield getRow(y * sizeX, (y + 1) * sizeX)
+
+def writeRows(rows, file):
+    """ Streams the text-output of a maze row by row to the file, without holding more than two rows of the maze.
+
+    The output is the same as Maze.writeTo for a maze with the same walls, but without any markers.
+
+    :param rows: an iterable of bytearrays with the NORTH- and WEST-bits of every cell of a row (including the east
+     boundary cell), the last row is the south boundary
+    :param file: the output, i.e. sys.stdout or a file opened for writing text
+    """
+    aboveRow = None
+    for row in rows:
+        upperLine, lowerLine = [], []
+        for x, cellWalls in enumerate(row):
+            index = (cellWalls & NORTH) << 3 | (cellWalls & WEST) << 1 \
+                | ((row[x-1] & NORTH) << 1 if x-1 >= 0 else 0) \
+                | ((aboveRow[x] & WEST) >> 1 if aboveRow is not None else 0)
+            upperLine.append(WALL_CONNECTION[index])
+            upperLine.append("━━━" if cellWalls & NORTH else "   ")
+            lowerLine.append("┃   " if cellWalls & WEST else "    ")
+        if aboveRow is not None:
+            file.write("".join(aboveLowerLine))
+            file.write("\n")
+        file.write("".join(upperLine))
+        file.write("\n")
+        aboveRow, aboveLowerLine = row, lowerLine   # the lower line of the south boundary row is never written
+
+
+class Spanning3:
+    def __init__(self, maze, links):
+        """ Read-only spanning-tree of a generated maze in compressed sparse row (CSR) format.
+
+        The paths of cell-id i are stored in neighbors[offsets[i]:offsets[i+1]]. Besides the CSR-arrays every cell
+        keeps its open directions as bits (1 << direction, see DIRECTION_X/DIRECTION_Y) in links, so checking if two
+        cells are connected is a single bit test. All arrays are exposed as read-only memoryviews, therefore one
+        Spanning3 is shared by every consumer without being copied.
+
+        :param maze: the maze the spanning-tree belongs to
+        :param links: one byte of direction-bits per cell-id, which is copied once on freezing
+        """
+        self.sizeX = maze.sizeX
+        self.links = bytes(links)
+        offsets, neighbors = array('l', [0]), array('l')
+        for cellId, cellLinks in enumerate(self.links):
+            for direction, step in ((0, 1), (1, self.sizeX), (2, -1), (3, -self.sizeX)):
+                if cellLinks >> direction & 1:
+                    neighbors.append(cellId + step)
+            offsets.append(len(neighbors))
+        self.offsets, self.neighbors = memoryview(offsets).toreadonly(), memoryview(neighbors).toreadonly()
+
+    @classmethod
+    @timed("spanning3.from_walls")
+    def fromWalls(cls, maze):
+        """ Derives the spanning-tree of an already generated maze (i.e. loaded or generated in a batch) from its walls.
+
+        :return: the Spanning3 of the maze
+        """
+        walls, sizeX, sizeY = maze.walls, maze.sizeX, maze.sizeY
+        links = bytearray(sizeX * sizeY)
+        for y in range(sizeY - 1):
+            for x in range(sizeX - 1):
+                cellId = y * sizeX + x
+                if x + 1 < sizeX - 1 and not walls[cellId + 1] & WEST:
+                    links[cellId] |= 1                   # right
+                    links[cellId + 1] |= 4               # left
+                if y + 1 < sizeY - 1 and not walls[cellId + sizeX] & NORTH:
+                    links[cellId] |= 2                   # down
+                    links[cellId + sizeX] |= 8           # up
+        return cls(maze, links)
+
+    def getNeighbors(self, cellId):
+        """ :return: a zero-copy view of the cell-ids connected to cellId """
+        return self.neighbors[self.offsets[cellId]:self.offsets[cellId + 1]]
+
+    def getDegree(self, cellId):
+        return self.offsets[cellId + 1] - self.offsets[cellId]
+
+    def isLinked(self, cellIdA, cellIdB):
+        """ :return: True, if a path (no wall) connects both neighboring cells """
+        difference = cellIdB - cellIdA
+        direction = 0 if difference == 1 else 1 if difference == self.sizeX else 2 if difference == -1 \
+            else 3 if difference == -self.sizeX else -1
+        return direction != -1 and self.links[cellIdA] >> direction & 1 == 1
+
+    def __len__(self):
+        return len(self.links)
+
 
 class Player:
-    def __init__(self, sizeX, sizeY):
+    def __init__(self, sizeX, sizeY, rng=None):
         self.pos, self.target = [0,0], [0,0]
+        self.rng = random.Random() if rng is None else rng
         self.sizeX, self.sizeY = sizeX-1, sizeY-1
         self.setPosTarget()
 
@@ -126,7 +442,7 @@ class Player:
 
     def setPos(self, x=-1, y=-1):
         if x == -1 or y == -1:
-            self.pos = [random.randint(0, self.sizeX), random.randint(0, self.sizeY)]
+            self.pos = [self.rng.randint(0, self.sizeX), self.rng.randint(0, self.sizeY)]
             if self.isPosTargetEqual() or not self.isPositionWithinMazeBoundary(self.getPosX(), self.getPosY()):
                 self.setPos()
         else:
@@ -141,16 +457,19 @@ class Player:
     def getTargetY(self):
         return self.target[1]
 
-    def setTarget(self):
-        self.target = [random.randint(0, self.sizeX), random.randint(0, self.sizeY)]
-        if self.isPosTargetEqual() or not self.isPositionWithinMazeBoundary(self.getTargetX(), self.getTargetY()):
-            self.setTarget()
+    def setTarget(self, x=-1, y=-1):
+        if x == -1 or y == -1:
+            self.target = [self.rng.randint(0, self.sizeX), self.rng.randint(0, self.sizeY)]
+            if self.isPosTargetEqual() or not self.isPositionWithinMazeBoundary(self.getTargetX(), self.getTargetY()):
+                self.setTarget()
+        else:
+            self.target = [x,y]
 
     def setPosTarget(self, sizeX=-1, sizeY=-1):
         if sizeX > -1 or sizeY > -1:
             self.sizeX, self.sizeY = sizeX, sizeY
-        self.pos = [random.randint(0, self.sizeX), random.randint(0, self.sizeY)]
-        self.target = [random.randint(0, self.sizeX), random.randint(0, self.sizeY)]
+        self.pos = [self.rng.randint(0, self.sizeX), self.rng.randint(0, self.sizeY)]
+        self.target = [self.rng.randint(0, self.sizeX), self.rng.randint(0, self.sizeY)]
         if self.isPosTargetEqual() \
                 or not self.isPositionWithinMazeBoundary(self.getPosX(), self.getPosY()) \
                 or not self.isPositionWithinMazeBoundary(self.getTargetX(), self.getTargetY()):
@@ -185,3 +504,32 @@ class Stack:
 
     def __repr__(self):
         return str(self.items)
+
+
+class UnionFind:
+    def __init__(self, size):
+        """ Disjoint sets of the ids 0 to size-1, merged by rank and searched with path compression (path halving).
+
+        Both operations take amortized almost constant time, the parents and ranks are stored in flat arrays.
+        """
+        self.parents = array('l', range(size))
+        self.ranks = bytearray(size)
+
+    def find(self, item):
+        parents = self.parents
+        while parents[item] != item:
+            parents[item] = parents[parents[item]]      # path halving: every visited id skips its parent
+            item = parents[item]
+        return item
+
+    def union(self, itemA, itemB):
+        """ :return: True, if both ids were in different sets, which are merged now """
+        rootA, rootB = self.find(itemA), self.find(itemB)
+        if rootA == rootB:
+            return False
+        if self.ranks[rootA] < self.ranks[rootB]:
+            rootA, rootB = rootB, rootA
+        self.parents[rootB] = rootA
+        if self.ranks[rootA] == self.ranks[rootB]:
+            self.ranks[rootA] += 1
+        return True
@@ -0,0 +1,191 @@
+import asyncio
+import random
+from model import Player
+from algo import Generator
+from cache import MazeCache
+from metrics import METRICS, span, timed
+
+MOVES = {"w": (0, -1, " ↑ "), "a": (-1, 0, " ← "), "s": (0, 1, " ↓ "), "d": (1, 0, " → ")}
+HELP = "commands: NEW x y [seed] [algorithm] ┃ MOVE w/a/s/d (or just w/a/s/d) ┃ SHOW ┃ SOLUTION ┃ " \
+       "VIEW width height ┃ METRICS ┃ QUIT"
+
+
+class GameSession:
+    def __init__(self, cache:MazeCache, maxCells):
+        """ The state of one player connected to the MazeServer.
+
+        The maze, its spanning3 and LCAIndex are immutable and shared by every session playing the same seed (through
+        the cache), a session only owns its Player and its markers, which are drawn over the shared maze as overlay.
+        """
+        self.cache, self.maxCells = cache, maxCells
+        self.generator, self.player, self.markers = None, None, {}
+        self.plyCounter, self.solutionSize, self.viewport = 0, 0, (20, 10)
+
+    @timed("server.command")
+    def handle(self, line) -> str:
+        """ :return: the response to one command-line of the client """
+        command, *arguments = line.split() or [""]
+        match command.lower():
+            case "new" if len(arguments) <= 4:
+                return self.newGame(*arguments)
+            case "move" if arguments:
+                return self.move(arguments[0].lower())
+            case "w" | "a" | "s" | "d":
+                return self.move(command.lower())
+            case "show":
+                return self.render()
+            case "solution":
+                return self.render(isShowSolution=True)
+            case "view" if len(arguments) == 2:
+                self.viewport = (max(1, int(arguments[0])), max(1, int(arguments[1])))
+                return self.render()
+            case "metrics":
+                return METRICS.toPrometheus().rstrip("\n")
+            case "help":
+                return HELP
+        return "Error: Wrong input! " + HELP
+
+    def newGame(self, x="10", y="10", seed=None, algorithm="dfs"):
+        x, y, algorithm, seed = self.getNewGameKey(x, y, seed, algorithm)
+        return self.startGame(self.cache.get(x, y, algorithm, seed), seed)
+
+    def getNewGameKey(self, x="10", y="10", seed=None, algorithm="dfs") -> tuple:
+        """ Validates the arguments of the command NEW.
+
+        :return: the tuple (x, y, algorithm, seed) of the requested maze, a random seed if None
+        :raise ValueError: if the size or the algorithm is invalid
+        """
+        x, y = int(x), int(y)
+        if not 2 <= x * y <= self.maxCells or x < 1 or y < 1:
+            raise ValueError("The maze must have 2 to {} cells!".format(self.maxCells))
+        if algorithm not in Generator.ALGORITHMS:
+            raise ValueError("Unknown algorithm, choose one of {}".format(", ".join(Generator.ALGORITHMS)))
+        return x, y, algorithm, random.getrandbits(63) if seed is None else int(seed)
+
+    def startGame(self, generator, seed) -> str:
+        """ Places a new player into the maze of the generator, start and target are reproduced by the seed.
+
+        The player's rng is its own one seeded by the seed, as the maze's rng belongs to the cached generator, which
+        is shared by every session playing the same maze.
+        """
+        self.generator = generator
+        x, y = generator.maze.sizeX - 1, generator.maze.sizeY - 1
+        self.player = Player(x, y, random.Random(seed))
+        self.plyCounter = 0
+        self.solutionSize = self.generator.getLCAIndex().getDistance(self._getPosId(), self._getTargetId())
+        self.markers = {self._getPosId(): "PLY", self._getTargetId(): "END"}
+        return "Maze of {}x{} cells with seed {}, the solution-path is {} cells long:\n{}".format(
+            x, y, seed, self.solutionSize, self.render())
+
+    def move(self, key) -> str:
+        if self.player is None or self.player.isPosTargetEqual():
+            return "Error: Start a new game with NEW first!"
+        if key not in MOVES:
+            return "Error: Invalid key pressed!"
+        columnModifier, rowModifier, marker = MOVES[key]
+        self.plyCounter += 1
+        destinationColumn = self.player.getPosX() + columnModifier
+        destinationRow = self.player.getPosY() + rowModifier
+        if not self.player.isPositionWithinMazeBoundary(destinationColumn, destinationRow):
+            return "Error: Invalid direction → out of maze boundary"
+        currentId, maze = self._getPosId(), self.generator.maze
+        destinationId = maze.getId(destinationColumn, destinationRow)
+        if not self.generator.getSpanning3().isLinked(currentId, destinationId):
+            return "Error: Invalid direction → wall"
+        self.player.setPos(destinationColumn, destinationRow)
+        self.markers[currentId], self.markers[destinationId] = marker, "PLY"
+        if self.player.isPosTargetEqual():
+            return "Congratulations! You reached the target-cell after {} steps, the solution-path is {} cells long." \
+                .format(self.plyCounter, self.solutionSize)
+        return self.render()
+
+    def render(self, isShowSolution=False) -> str:
+        if self.player is None:
+            return "Error: Start a new game with NEW first!"
+        maze, markers = self.generator.maze, self.markers
+        if isShowSolution:
+            path = self.generator.getLCAIndex().getPath(self._getPosId(), self._getTargetId())
+            markers = dict(markers)
+            markers.update((cellId, " ■ ") for cellId in path[1:-1])
+        window = maze.getWindow(self.player.getPosX(), self.player.getPosY(), *self.viewport)
+        return maze.renderWindow(*window, markers=markers)
+
+    def _getPosId(self):
+        return self.generator.maze.getId(self.player.getPosX(), self.player.getPosY())
+
+    def _getTargetId(self):
+        return self.generator.maze.getId(self.player.getTargetX(), self.player.getTargetY())
+
+
+class MazeServer:
+    def __init__(self, host="127.0.0.1", port=8023, memoryBudget=256 * 1024 * 1024, maxCells=4_000_000):
+        """ Asyncio server running a maze-game session per connected client with a line protocol over TCP.
+
+        Every response is followed by an empty line. Mazes are generated once per (size, algorithm, seed) and shared
+        by all sessions through a MazeCache, which renders only the window around each player, so the latency of a
+        move depends on the size of the window and not on the maze or the count of sessions.
+
+        :param memoryBudget: the memory budget of the MazeCache in bytes
+        :param maxCells: the maximum cell count of a maze requested by a client
+        """
+        self.host, self.port, self.maxCells = host, port, maxCells
+        self.cache = MazeCache(memoryBudget, isRenderingCells=False)
+        self.sessionCount = 0
+        self._building = {}                      # cache-key → future of the maze generated in a worker-thread
+
+    async def getGenerator(self, x, y, algorithm, seed) -> Generator:
+        """ Gets a maze from the cache or generates it in a worker-thread, so the event-loop keeps serving the moves
+        of the other sessions meanwhile. Concurrent requests of the same maze share one generation. """
+        key = (x, y, algorithm, seed, None)
+        if key in self.cache:
+            return self.cache.get(x, y, algorithm, seed)
+        future = self._building.get(key)
+        if future is None:
+            future = self._building[key] = asyncio.ensure_future(self._build(key))
+        return await asyncio.shield(future)  # a disconnecting client doesn't cancel the generation for the others
+
+    async def _build(self, key) -> Generator:
+        try:
+            generator = await asyncio.to_thread(self.cache.build, *key)
+            return self.cache.put(key, generator)        # the cache is only changed by the event-loop's thread
+        finally:
+            del self._building[key]
+
+    async def respond(self, session, line) -> str:
+        """ :return: the response of the session to the command-line, NEW generates its maze off the event-loop """
+        command, *arguments = line.split() or [""]
+        if command.lower() == "new" and len(arguments) <= 4:
+            x, y, algorithm, seed = session.getNewGameKey(*arguments)
+            generator = await self.getGenerator(x, y, algorithm, seed)
+            with span("server.command"):
+                return session.startGame(generator, seed)
+        return session.handle(line)
+
+    async def handleClient(self, reader:asyncio.StreamReader, writer:asyncio.StreamWriter):
+        session = GameSession(self.cache, self.maxCells)
+        self.sessionCount += 1
+        try:
+            writer.write((HELP + "\n\n").encode())
+            while line := await reader.readline():
+                line = line.decode(errors="replace").strip()
+                if line.lower() in ("quit", "9", "q"):
+                    break
+                try:
+                    response = await self.respond(session, line)
+                except (ValueError, TypeError) as error:
+                    response = f"Error: {error}"
+                writer.write((response + "\n\n").encode())
+                await writer.drain()
+        finally:
+            self.sessionCount -= 1
+            writer.close()
+
+    async def serve(self):
+        server = await asyncio.start_server(self.handleClient, self.host, self.port)
+        async with server:
+            await server.serve_forever()
+
+
+def runServer(host="127.0.0.1", port=8023, memoryBudget=256 * 1024 * 1024):
+    print(" Maze-Game server listening on {}:{}".format(host, port))
+    asyncio.run(MazeServer(host, port, memoryBudget).serve())
@@ -0,0 +1,223 @@
+import struct
+import time
+from cache import MazeCache
+from algo import Generator
+from metrics import timed
+
+# a session-record: this header, the moves packed into 2 bits each and the varint-encoded time deltas of the moves
+SESSION_HEADER = struct.Struct("<4sB?2xIIQ16sdQIIIIIII")
+SESSION_MAGIC, SESSION_VERSION = b"MZSN", 1
+NO_BRAID = -1.0                              # the braid-value of a perfect maze in the header
+MOVE_DIGITS = bytes.maketrans(bytes(range(4)), b"0123")
+# a byte of packed moves to its 4 directions, the first move is stored in the lowest 2 bits
+BYTE_MOVES = tuple(bytes(byte >> shift & 3 for shift in (0, 2, 4, 6)) for byte in range(256))
+CONTINUATION_BYTES = bytes(range(128, 256))  # the bytes of a varint followed by another byte of the same varint
+
+
+class Session:
+    def __init__(self, sizeX, sizeY, seed, algorithm, braid, startId, targetId, solutionSize, startTime=None):
+        """ Compact record of one game: the reference of the maze, start and target, and every move of the player.
+
+        The maze itself isn't stored, it's regenerated from its size, seed, algorithm and braid. A move is one of the
+        directions of the spanning3 (0: right, 1: down, 2: left, 3: up), so it's packed into 2 bits, and its time is
+        stored as the milliseconds since the previous move in a varint (1 byte for a delta below 128 ms, 2 bytes below
+        16 s). A record of a game of 100 moves needs 84 + 25 bytes plus 100 to 200 bytes for its times.
+
+        :param sizeX: cell count of the x-axis without the boundary (like Maze)
+        :param sizeY: cell count of the y-axis without the boundary
+        :param braid: the loopRatio of Generator.braid, None for a perfect maze
+        :param startId: the cell-id (Maze.getId) of the player's position at the start of the session
+        :param targetId: the cell-id of the target
+        :param solutionSize: the steps of the shortest path from start to target
+        :param startTime: the wall-clock time of the start in nanoseconds since the epoch, now if None
+        """
+        self.sizeX, self.sizeY, self.seed, self.algorithm, self.braid = sizeX, sizeY, seed, algorithm, braid
+        self.startId, self.targetId, self.solutionSize = startId, targetId, solutionSize
+        self.startTime = time.time_ns() if startTime is None else startTime
+        self.plyCounter, self.wastedPlies, self.isFinished = 0, 0, False
+        self.moves, self.times = bytearray(), bytearray()           # one direction per byte, the varint time deltas
+        self._startClock, self._lastMs = time.monotonic_ns(), 0
+
+    @classmethod
+    def fromGame(cls, maze, braid, startId, targetId, solutionSize):
+        """ :return: a new Session of a game on the Maze (see MazeGame.play) """
+        return cls(maze.sizeX - 1, maze.sizeY - 1, maze.seed, maze.algorithm, braid, startId, targetId, solutionSize)
+
+    def recordMove(self, direction):
+        """ Records a move of the player to the linked neighbor in the direction (0: right, 1: down, 2: left, 3: up). """
+        ms = (time.monotonic_ns() - self._startClock) // 1_000_000
+        _appendVarint(self.times, ms - self._lastMs)            # delta to the previous move, so it stays small
+        self._lastMs = ms
+        self.moves.append(direction)
+
+    def recordWastedPly(self):
+        """ Records a counted ply without move: an invalid key, a wall or the maze boundary in the way. """
+        self.wastedPlies += 1
+
+    def finish(self, plyCounter, isFinished):
+        """ :param plyCounter: the score of the game, the count of plies the player needed
+            :param isFinished: True, if the player reached the target, False if the game was ended before """
+        self.plyCounter, self.isFinished = plyCounter, isFinished
+
+    def getTimes(self) -> list:
+        """ :return: the time of every move in milliseconds since the start of the session """
+        times, ms, value, shift = [], 0, 0, 0
+        for byte in self.times:
+            value |= (byte & 0x7F) << shift
+            shift += 7
+            if byte < 0x80:
+                ms += value
+                times.append(ms)
+                value, shift = 0, 0
+        return times
+
+    def pack(self) -> bytes:
+        packedMoves = b""
+        if self.moves:                           # the moves as base-4 number, the last move is the highest digit
+            packedMoves = int(self.moves[::-1].translate(MOVE_DIGITS), 4).to_bytes((len(self.moves) + 3) // 4, "little")
+        return SESSION_HEADER.pack(SESSION_MAGIC, SESSION_VERSION, self.isFinished, self.sizeX, self.sizeY, self.seed,
+                                   self.algorithm.encode("ascii"), NO_BRAID if self.braid is None else self.braid,
+                                   self.startTime, self.startId, self.targetId, self.solutionSize, self.plyCounter,
+                                   self.wastedPlies, len(self.moves), len(self.times)) + packedMoves + self.times
+
+    @classmethod
+    def unpack(cls, data, offset=0):
+        """ Reads the session-record at offset of data, i.e. the content of a session-log.
+
+        The values of the header aren't validated here (see Replayer.verify), only the framing of the record.
+
+        :return: a tuple of the Session and the offset of the next record
+        :raise ValueError: if there's no complete session-record at offset
+        """
+        if len(data) - offset < SESSION_HEADER.size:
+            raise ValueError("truncated session-record at offset {}: {} of {} header bytes".format(
+                offset, len(data) - offset, SESSION_HEADER.size))
+        (magic, version, isFinished, sizeX, sizeY, seed, algorithm, braid, startTime, startId, targetId, solutionSize,
+         plyCounter, wastedPlies, moveCount, timesSize) = SESSION_HEADER.unpack_from(data, offset)
+        if magic != SESSION_MAGIC or version != SESSION_VERSION:
+            raise ValueError("no session-record of version {} at offset {}".format(SESSION_VERSION, offset))
+        movesSize = (moveCount + 3) // 4
+        if len(data) - offset - SESSION_HEADER.size < movesSize + timesSize:
+            raise ValueError("truncated session-record at offset {}: {} moves and {} time-bytes don't fit".format(
+                offset, moveCount, timesSize))
+        session = cls(sizeX, sizeY, seed, algorithm.rstrip(b"\0").decode("ascii", errors="replace"),
+                      None if braid < 0 else braid, startId, targetId, solutionSize, startTime)
+        session.plyCounter, session.wastedPlies, session.isFinished = plyCounter, wastedPlies, isFinished
+        offset += SESSION_HEADER.size
+        session.moves = bytearray(b"".join(map(BYTE_MOVES.__getitem__, data[offset:offset + movesSize]))[:moveCount])
+        offset += movesSize
+        session.times = bytearray(data[offset:offset + timesSize])
+        return session, offset + timesSize
+
+
+def _appendVarint(data, value):
+    """ Appends the non-negative int as LEB128-varint: 7 bits per byte, the high bit marks a following byte. """
+    while value >= 0x80:
+        data.append(value & 0x7F | 0x80)
+        value >>= 7
+    data.append(value)
+
+def appendSession(path, session):
+    """ Appends the session to the session-log at path, the log is created by its first session. """
+    with open(path, "ab") as file:
+        file.write(session.pack())
+
+def readSessions(path):
+    """ :return: an iterator of the Sessions of the session-log in the order they were recorded """
+    with open(path, "rb") as file:
+        data = file.read()
+    offset = 0
+    while offset < len(data):
+        session, offset = Session.unpack(data, offset)
+        yield session
+
+
+class Replayer:
+    def __init__(self, memoryBudget=256 * 1024 * 1024, maxCells=4_000_000):
+        """ Headless verification of recorded sessions against the spanning3 of their mazes, nothing is rendered.
+
+        The mazes are regenerated once per (size, seed, algorithm, braid) and shared by their sessions in a MazeCache,
+        so the replay of a session costs its moves (a bit-test of the link per move) plus an O(log n) distance-query
+        of the LCAIndex (the DistanceField of the target for braided mazes).
+
+        :param memoryBudget: the memory budget of the MazeCache in bytes
+        :param maxCells: the maximum cell count of a recorded maze, a session of a larger maze is invalid
+        """
+        self.cache, self.maxCells = MazeCache(memoryBudget, isRenderingCells=False), maxCells
+
+    def verify(self, session) -> dict:
+        """ Replays a session and recomputes its score.
+
+     |  1  CHECK the reference of the maze AND GET the maze of the session from the cache
+     |  2  FOR every move: IF the spanning3 has no link from the player's cell in the direction THEN it's illegal
+     |     ELSE move the player, the game ends on the target, so no move may follow it
+     |  3  CHECK the finished flag, the plyCounter (moves + wasted plies), the solutionSize and the timestamps
+
+        :return: a dict with "isValid", the "errors", the recomputed "plyCounter", "solutionSize" and their "difference"
+        """
+        errors = self._getHeaderErrors(session)                                                                # 1
+        if errors:
+            return {"isValid": False, "errors": errors, "plyCounter": None, "solutionSize": None, "difference": None}
+        generator = self.cache.get(session.sizeX, session.sizeY, session.algorithm, session.seed, session.braid)
+        maze, links = generator.maze, generator.getSpanning3().links
+        steps = (1, maze.sizeX, -1, -maze.sizeX)
+        startId, targetId, cellCount = session.startId, session.targetId, maze.sizeX * maze.sizeY
+        if not (0 <= startId < cellCount and 0 <= targetId < cellCount and links[startId] and links[targetId]):
+            return {"isValid": False, "errors": ["start or target isn't a cell of the maze"], "plyCounter": None,
+                    "solutionSize": None, "difference": None}
+        cellId = startId
+        for index, direction in enumerate(session.moves):                                                   # 2
+            if cellId == targetId:
+                errors.append("move {} after the target was reached".format(index))
+                break
+            if not links[cellId] >> direction & 1:
+                errors.append("move {} from cell {} in direction {} runs into a wall".format(index, cellId, direction))
+                break
+            cellId += steps[direction]
+
+        plyCounter = len(session.moves) + session.wastedPlies                                               # 3
+        if generator.isPerfect:
+            solutionSize = generator.getLCAIndex().getDistance(startId, targetId)
+        else:
+            solutionSize = generator.getDistanceField(targetId % maze.sizeX, targetId // maze.sizeX).getDistance(startId)
+        if not errors and session.isFinished != (cellId == targetId):
+            errors.append("the game is marked as {} but ends {} the target".format(
+                "finished" if session.isFinished else "unfinished", "off" if session.isFinished else "on"))
+        if plyCounter != session.plyCounter:
+            errors.append("plyCounter {} recorded, {} replayed".format(session.plyCounter, plyCounter))
+        if solutionSize != session.solutionSize:
+            errors.append("solutionSize {} recorded, {} replayed".format(session.solutionSize, solutionSize))
+        timeCount = len(session.times.translate(None, CONTINUATION_BYTES))    # every varint ends with a byte < 0x80
+        if timeCount != len(session.moves) or session.times and session.times[-1] >= 0x80:
+            errors.append("{} moves, but other timestamps".format(len(session.moves)))
+        return {"isValid": not errors, "errors": errors, "plyCounter": plyCounter, "solutionSize": solutionSize,
+                "difference": plyCounter - solutionSize}
+
+    def _getHeaderErrors(self, session) -> list:
+        """ :return: the errors of the maze-reference of a (maybe tampered) session, before its maze is generated """
+        errors = []
+        if session.algorithm not in Generator.ALGORITHMS:
+            errors.append("unknown algorithm '{}'".format(session.algorithm))
+        if not (session.sizeX >= 1 and session.sizeY >= 1 and 2 <= session.sizeX * session.sizeY <= self.maxCells):
+            errors.append("the maze of {}x{} cells isn't within 2 to {} cells".format(session.sizeX, session.sizeY,
+                                                                                     self.maxCells))
+        if session.braid is not None and not 0 <= session.braid <= 1:
+            errors.append("braid {} isn't between 0 and 1".format(session.braid))
+        return errors
+
+    @timed("session.replay")
+    def replayLog(self, path) -> dict:
+        """ Verifies every session of a session-log.
+
+        :return: the summary as JSON-serializable dict with the counts, the throughput and the invalid sessions
+        """
+        startTime, invalid, sessionCount, finishedCount = time.perf_counter(), [], 0, 0
+        for index, session in enumerate(readSessions(path)):
+            result = self.verify(session)
+            sessionCount, finishedCount = sessionCount + 1, finishedCount + session.isFinished
+            if not result["isValid"]:
+                invalid.append({"session": index, "errors": result["errors"]})
+        duration = time.perf_counter() - startTime
+        return {"sessions": sessionCount, "finished": finishedCount, "valid": sessionCount - len(invalid),
+                "invalid": invalid, "mazes": self.cache.misses, "seconds": duration,
+                "sessionsPerSec": sessionCount / duration if duration else 0.0}
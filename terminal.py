@@ -0,0 +1,59 @@
+import os
+import shutil
+import sys
+from model import Maze
+
+CLEAR_SCREEN = "\x1b[2J\x1b[H"        # clears the screen and moves the cursor to the top-left corner
+CLEAR_BELOW = "\x1b[J"                 # clears the screen from the cursor to the end
+MOVE_CURSOR = "\x1b[{};{}H"            # moves the cursor to row, column (both 1-based)
+
+
+class AnsiTerminal:
+    def __init__(self, maze:Maze, file=sys.stdout):
+        """ Draws the maze once and afterwards only rewrites the markers of the changed cells with ANSI escape codes.
+
+        The changed cells are tracked by Maze.setMarker, so moving the player, its arrow-trail and (un)marking the
+        solution-path are redrawn without scrolling the terminal. If the file isn't a terminal supporting ANSI escape
+        codes or the maze doesn't fit into the terminal (it would scroll or wrap, so the cursor-positions of the cells
+        were off), every update falls back to printing the whole maze.
+
+        :param maze: the maze to draw, its cells-output is built on the first draw if it doesn't exist yet
+        :param file: the output of the terminal
+        """
+        self.maze, self.file = maze, file
+        self.isSupported = self.file.isatty() and os.environ.get("TERM", "dumb") != "dumb"
+        self.isDrawn, self.isFitting = False, False
+        self.maze.popChangedCells()              # starts tracking the changed cells of the maze
+
+    def isMazeFitting(self):
+        """ :return: True, if the maze (2 lines and 4 columns per cell) and the input-line below it fit into the
+         terminal, which is checked on every draw, as the terminal can be resized """
+        columns, lines = shutil.get_terminal_size()
+        return 4 * self.maze.sizeX <= columns and 2 * self.maze.sizeY <= lines
+
+    def draw(self):
+        """ Clears the terminal and draws the whole maze, the cursor is placed on the line below the maze. """
+        self.isFitting = self.isSupported and self.isMazeFitting()
+        if self.isFitting:
+            self.file.write(CLEAR_SCREEN)
+        self.maze.writeTo(self.file)
+        self.maze.popChangedCells()
+        self.isDrawn = True
+        self.file.flush()
+
+    def update(self):
+        """ Rewrites only the markers of the cells changed since the last draw or update and clears everything below
+        the maze (i.e. the previous messages and input prompt). """
+        if not self.isFitting or not self.isDrawn:
+            self.draw()
+            return
+        markers, sizeX = self.maze.markers, self.maze.sizeX
+        output = []
+        for cellId in self.maze.popChangedCells():
+            y, x = divmod(cellId, sizeX)
+            output.append(MOVE_CURSOR.format(2 * y + 2, 4 * x + 2))
+            output.append(markers.get(cellId, "   "))
+        output.append(MOVE_CURSOR.format(2 * self.maze.sizeY, 1))
+        output.append(CLEAR_BELOW)
+        self.file.write("".join(output))
+        self.file.flush()